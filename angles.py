@@ -0,0 +1,31 @@
+"""
+Tablas trigonométricas precalculadas para Asteroids
+
+Los ángulos del juego están en grados. UNIT guarda el vector unitario
+(cos, sin) de cada paso de 1/ANGLE_STEPS_PER_DEGREE de grado. Los rumbos de
+la nave son enteros (gira de 5 en 5), así su índice es exacto y se obtiene
+sin redondear, que es donde la tabla gana a radians + cos + sin (error del
+orden de 1e-15). Con ángulos arbitrarios el redondeo cuesta
+más que math en CPython (ver benchmark.py --trig), así que ahí se sigue
+usando math.
+"""
+
+import math
+from constants import ANGLE_STEPS_PER_DEGREE
+
+STEPS = 360 * ANGLE_STEPS_PER_DEGREE
+
+UNIT = [(math.cos(math.radians(i / ANGLE_STEPS_PER_DEGREE)),
+         math.sin(math.radians(i / ANGLE_STEPS_PER_DEGREE)))
+        for i in range(STEPS)]
+
+
+def index(angle):
+    """Índice de tabla de un ángulo en grados (cualquier signo o vuelta)"""
+    return round(angle * ANGLE_STEPS_PER_DEGREE) % STEPS
+
+
+def unit(angle):
+    """Vector unitario (cos, sin) de un ángulo en grados"""
+    return UNIT[round(angle * ANGLE_STEPS_PER_DEGREE) % STEPS]
+
@@ -0,0 +1,187 @@
+"""
+Transformación por lotes de los polígonos de asteroides para Asteroids
+
+Los vértices locales de cada forma se empaquetan una sola vez en un array
+relleno (filas x vértices x 2) y en cada frame se rotan y trasladan todos
+los asteroides en una sola pasada vectorizada; pygame.draw.polygon sólo
+recibe los puntos ya calculados. Si numba está instalado la pasada se
+compila con JIT; si no, se hace con NumPy. NumPy es opcional: sólo hace
+falta para este modo de dibujo.
+
+Sólo compensa con miles de asteroides (benchmark.py: unos 12 ms de dibujo
+frente a 16 ms del vectorial con 1k). Con los pocos de una partida normal
+no hay ganancia medible: el coste fijo de NumPy iguala o supera lo que se
+ahorra. La pasada no parte de los cascos cacheados de Asteroid.get_hull:
+las colisiones sólo los calculan para los candidatos del broadphase, y
+rellenarlos para todos rota cada asteroide en Python, que es justo lo que
+esta pasada evita (con 1k asteroides el dibujo pasaba a unos 25 ms).
+"""
+
+import pygame
+from constants import *
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+
+def _transform_numpy(local, rows, state, alpha, out):
+    """Rotar y trasladar los vértices de todos los asteroides a la vez.
+
+    `state` tiene una fila por asteroide: x, y, rotación del paso anterior
+    y del actual. El resultado (asteroides x vértices x 2) va a `out`.
+    """
+    prev_x, prev_y, prev_rotation, x, y, rotation = state.T
+
+    # Interpolar la posición por el camino más corto (ver wrap_lerp)
+    dx = np.remainder(x - prev_x, WINDOW_WIDTH)
+    dx[dx > WINDOW_WIDTH / 2] -= WINDOW_WIDTH
+    dy = np.remainder(y - prev_y, WINDOW_HEIGHT)
+    dy[dy > WINDOW_HEIGHT / 2] -= WINDOW_HEIGHT
+    center_x = (prev_x + dx * alpha)[:, None]
+    center_y = (prev_y + dy * alpha)[:, None]
+
+    rotation_rad = np.radians(
+        prev_rotation + (rotation - prev_rotation) * alpha)
+    cos_r = np.cos(rotation_rad)[:, None]
+    sin_r = np.sin(rotation_rad)[:, None]
+
+    points = local[rows]
+    point_x = points[:, :, 0]
+    point_y = points[:, :, 1]
+    out[:, :, 0] = point_x * cos_r - point_y * sin_r + center_x
+    out[:, :, 1] = point_x * sin_r + point_y * cos_r + center_y
+    return out
+
+
+def _transform_loops(local, rows, state, alpha, out):
+    """La misma pasada con bucles explícitos, para compilarla con numba"""
+    half_width = WINDOW_WIDTH / 2
+    half_height = WINDOW_HEIGHT / 2
+    for i in range(rows.shape[0]):
+        prev_x = state[i, 0]
+        prev_y = state[i, 1]
+        prev_rotation = state[i, 2]
+        x = state[i, 3]
+        y = state[i, 4]
+        rotation = state[i, 5]
+        dx = (x - prev_x) % WINDOW_WIDTH
+        if dx > half_width:
+            dx -= WINDOW_WIDTH
+        dy = (y - prev_y) % WINDOW_HEIGHT
+        if dy > half_height:
+            dy -= WINDOW_HEIGHT
+        center_x = prev_x + dx * alpha
+        center_y = prev_y + dy * alpha
+        rotation_rad = np.radians(
+            prev_rotation + (rotation - prev_rotation) * alpha)
+        cos_r = np.cos(rotation_rad)
+        sin_r = np.sin(rotation_rad)
+        row = rows[i]
+        for j in range(local.shape[1]):
+            point_x = local[row, j, 0]
+            point_y = local[row, j, 1]
+            out[i, j, 0] = point_x * cos_r - point_y * sin_r + center_x
+            out[i, j, 1] = point_x * sin_r + point_y * cos_r + center_y
+    return out
+
+
+if numba is not None:
+    # cache=True guarda lo compilado junto al módulo: la compilación se
+    # paga una sola vez por instalación, al crear AsteroidBatch
+    transform = numba.njit(cache=True)(_transform_loops)
+else:
+    transform = _transform_numpy
+
+
+class AsteroidBatch:
+    """Vértices locales empaquetados por forma y su transformación por lotes.
+
+    Cada forma (plantilla del catálogo, ver shapes.py) ocupa una fila del
+    array `local`, compartida por todos los asteroides que la usan; si las
+    filas superan con creces a los asteroides se reempaqueta desde cero.
+    """
+
+    def __init__(self, capacity=256, width=10):
+        if np is None:
+            raise RuntimeError("El dibujo por lotes necesita numpy")
+        self.local = np.zeros((capacity, width, 2))
+        self.counts = []  # vértices reales de cada fila
+        self.rows = {}  # shape_id -> fila
+        self.out = np.zeros((0, width, 2))
+        if numba is not None:
+            # Compilar (o cargar del caché) al pulsar F2 y no en mitad del
+            # primer frame dibujado por lotes
+            transform(self.local, np.zeros(1, dtype=np.intp),
+                      np.zeros((1, 6)), 1.0, np.zeros((1, width, 2)))
+
+    def transform(self, asteroids, alpha=1.0):
+        """Contornos en pantalla de todos los asteroides, en el mismo orden.
+
+        Cada contorno es una vista (vértices x 2) de un array que se
+        reutiliza en la siguiente llamada.
+        """
+        if not asteroids:
+            return []
+        rows = self.rows
+        if len(rows) > 2 * len(asteroids) + 64:
+            self.clear()
+
+        indices = []
+        state = []
+        for asteroid in asteroids:
+            row = rows.get(asteroid.shape_id)
+            if row is None:
+                row = self._pack(asteroid)
+            indices.append(row)
+            state.append((asteroid.prev_x, asteroid.prev_y,
+                          asteroid.prev_rotation, asteroid.x, asteroid.y,
+                          asteroid.rotation))
+
+        count = len(indices)
+        width = self.local.shape[1]
+        if self.out.shape[0] < count or self.out.shape[1] != width:
+            self.out = np.zeros((max(count, 2 * self.out.shape[0]), width, 2))
+        out = transform(self.local, np.array(indices, dtype=np.intp),
+                        np.array(state, dtype=np.float64), float(alpha),
+                        self.out[:count])
+
+        # Vistas del array, sin copiar: pygame.draw.polygon las acepta y
+        # convertir todo con tolist() costaría más que la propia pasada
+        counts = self.counts
+        return [out[i, :counts[row]] for i, row in enumerate(indices)]
+
+    def draw(self, screen, asteroids, alpha=1.0):
+        """Dibujar todos los asteroides; devuelve sus rectángulos"""
+        polygon = pygame.draw.polygon
+        return [polygon(screen, WHITE, outline, 1)
+                for outline in self.transform(asteroids, alpha)]
+
+    def clear(self):
+        self.rows.clear()
+        self.counts.clear()
+
+    def _pack(self, asteroid):
+        """Copiar los vértices locales de una forma a una fila libre"""
+        points = asteroid.points
+        row = len(self.counts)
+        capacity, width, _ = self.local.shape
+        if row >= capacity or len(points) > width:
+            if row >= capacity:
+                capacity *= 2
+            local = np.zeros((capacity, max(width, len(points)), 2))
+            local[:self.local.shape[0], :width] = self.local
+            self.local = local
+
+        # El relleno de la fila no se usa: los contornos se recortan a
+        # `counts` al devolverlos
+        self.local[row, :len(points)] = points
+        self.counts.append(len(points))
+        self.rows[asteroid.shape_id] = row
+        return row
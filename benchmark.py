@@ -0,0 +1,417 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de simulación y dibujo para Asteroids
+
+Ejecuta Game.update, Game.check_collisions y las rutas de dibujo sobre
+mundos sintéticos de 10, 100, 1k y 10k asteroides y balas, con el driver de
+vídeo "dummy" de SDL para que funcione en un servidor sin pantalla. Mide
+también el dibujo de las pantallas fuera de la partida (fin de partida,
+nombre y tabla de puntuaciones). Guarda frames/s, tiempos por fase y memoria
+máxima en JSON y los compara con una línea base para detectar regresiones.
+
+    python benchmark.py                      # medir y comparar
+    python benchmark.py --save-baseline      # guardar la línea base
+    python benchmark.py --repeat 5           # mediana de 5 repeticiones
+    python benchmark.py --trig               # tablas de angles.py vs math
+
+Los tiempos sólo son comparables en la misma máquina, así que no se
+versiona ninguna línea base (bench_results.json y bench_baseline.json
+están en .gitignore). En CI, el job "benchmark" de cada pull request mide
+primero la rama de destino con --save-baseline y luego la del PR contra
+esa línea base, en el mismo runner.
+"""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import math
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pygame
+
+from constants import *
+from profiler import PHASES
+
+SIZES = [10, 100, 1000, 10000]
+RENDER_MODES = ["vector", "sprites", "batch"]
+SCREENS = ["game_over", "enter_name", "show_scores"]
+SCREEN_SCORES = 200  # puntuaciones de la tabla sintética
+SCREEN_NAME = "ASTEROIDS"
+
+
+def build_world(game, count, seed):
+    """Llenar el juego con `count` asteroides y balas en posiciones fijas"""
+    rng = random.Random(seed)
+    game.reset_game(seed)
+    for asteroid in game.asteroids:
+        game.asteroid_pool.release(asteroid)
+    game.asteroids.clear()
+
+    for _ in range(count):
+        x = rng.uniform(0, WINDOW_WIDTH)
+        y = rng.uniform(0, WINDOW_HEIGHT)
+        game.asteroids.append(game.asteroid_pool.acquire(
+            x, y, rng.randrange(len(ASTEROID_SIZES)), game.rng))
+
+        bullet = game.bullet_pool.acquire(
+            rng.uniform(0, WINDOW_WIDTH), rng.uniform(0, WINDOW_HEIGHT),
+            rng.randrange(360))  # rumbo entero, como los de la nave
+        bullet.lifetime = 10 ** 9  # que no expiren durante la medición
+        game.bullets.append(bullet)
+
+    # La nave no debe morir durante la medición
+    game.invulnerable_time = 10 ** 9
+
+
+def run_case(game, count, render_mode, frames, seed):
+    """Medir un caso y devolver sus resultados"""
+    game.render_mode = render_mode
+    profiler = game.profiler
+    build_world(game, count, seed)
+
+    # Calentar cachés (sprites, pools) antes de medir
+    for _ in range(5):
+        game.step()
+        game.draw()
+
+    build_world(game, count, seed)
+    profiler.enabled = True
+    profiler.reset()
+    start = time.perf_counter()
+    for _ in range(frames):
+        profiler.begin_frame()
+        game.step()
+        game.draw()
+        profiler.end_frame(game)
+    elapsed = time.perf_counter() - start
+    profiler.enabled = False
+
+    summary = profiler.summary()
+
+    # Memoria máxima en una pasada corta aparte (tracemalloc es lento)
+    build_world(game, count, seed)
+    tracemalloc.start()
+    for _ in range(min(frames, 10)):
+        game.step()
+        game.draw()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "asteroids": count,
+        "render_mode": render_mode,
+        "frames": frames,
+        "fps": frames / elapsed,
+        "phases_ms": {name: dict(zip(("p50", "p95", "p99"), summary[name]))
+                      for name in ("total",) + PHASES},
+        "peak_kb": peak / 1024,
+        "final_asteroids": len(game.asteroids),
+        "final_bullets": len(game.bullets),
+    }
+
+
+def fill_high_scores(directory, seed):
+    """Tabla de puntuaciones sintética en `directory`, para no medir (ni
+    modificar) la del jugador"""
+    from highscores import HighScores
+
+    rng = random.Random(seed)
+    high_scores = HighScores(os.path.join(directory, "highscores.json"))
+    for i in range(SCREEN_SCORES):
+        high_scores.add_score(f"P{i:03d}", rng.randrange(0, 100000, 10))
+    high_scores.flush()
+    return high_scores
+
+
+def run_screen(game, screen, frames, seed):
+    """Medir el dibujo de una pantalla fuera de la partida.
+
+    Cada cuatro frames cambia lo que cambia con el uso (el nombre que se
+    teclea, la página de la tabla): la mediana mide el blit de las capas
+    cacheadas y los percentiles altos su redibujo.
+    """
+    profiler = game.profiler
+    build_world(game, 10, seed)
+    game.final_rank = game.high_scores.get_rank(game.score)
+    game.game_state = screen
+    total = game.high_scores.count()
+    pages = max(1, total - SCORES_PAGE_SIZE + 1)
+
+    def change(frame):
+        if frame % 4:
+            return
+        edit = frame // 4
+        if screen == "enter_name":
+            game.name_input = SCREEN_NAME[:edit % (len(SCREEN_NAME) + 1)]
+        elif screen == "show_scores":
+            game.scores_offset = edit * 3 % pages
+
+    for frame in range(5):
+        change(frame)
+        game.draw()
+
+    profiler.enabled = True
+    profiler.reset()
+    start = time.perf_counter()
+    for frame in range(frames):
+        change(frame)
+        profiler.begin_frame()
+        game.draw()
+        profiler.end_frame(game)
+    elapsed = time.perf_counter() - start
+    profiler.enabled = False
+
+    summary = profiler.summary()
+    return {
+        "screen": screen,
+        "frames": frames,
+        "fps": frames / elapsed,
+        "phases_ms": {name: dict(zip(("p50", "p95", "p99"), summary[name]))
+                      for name in ("total", "draw", "flip")},
+    }
+
+
+def median_run(runs):
+    """La repetición con la mediana del tiempo de frame mediano: una sola
+    pasada es demasiado ruidosa en máquinas compartidas"""
+    runs = sorted(runs, key=lambda run: run["phases_ms"]["total"]["p50"])
+    result = runs[len(runs) // 2]
+    result["repeat"] = len(runs)
+    return result
+
+
+def bench_trig(samples=200000, seed=1234):
+    """Trigonometría antes y después de las tablas de angles.py.
+
+    Mide ns por llamada en cada forma en que el juego la usa: rumbo entero
+    de la nave (índice exacto de la tabla), ángulo arbitrario (angles.unit,
+    que redondea), casco de la nave (caché por rumbo) y contorno de un
+    asteroide (un seno y un coseno por asteroide en lugar de cuatro por
+    vértice). Para las dos primeras también el error máximo de la tabla.
+    """
+    import angles
+    from entities import Ship
+
+    rng = random.Random(seed)
+    radians, cos, sin = math.radians, math.cos, math.sin
+    headings = [rng.randrange(-720, 720, 5) for _ in range(samples)]
+    floats = [rng.uniform(0, 360) for _ in range(samples)]
+    points = [(rng.uniform(-40, 40), rng.uniform(-40, 40)) for _ in range(8)]
+    ship = Ship(0, 0)
+
+    def heading_math(values):
+        for angle in values:
+            angle_rad = radians(angle)
+            cos(angle_rad), sin(angle_rad)
+
+    def heading_table(values):
+        table, k, steps = angles.UNIT, ANGLE_STEPS_PER_DEGREE, angles.STEPS
+        for angle in values:
+            table[angle * k % steps]
+
+    def float_table(values):
+        unit = angles.unit
+        for angle in values:
+            unit(angle)
+
+    def hull_math(values):
+        size = ship.size
+        for angle in values:
+            angle_rad = radians(angle)
+            back1 = angle_rad + 2.8
+            back2 = angle_rad - 2.8
+            ((cos(angle_rad) * size, sin(angle_rad) * size),
+             (cos(back1) * size * 0.7, sin(back1) * size * 0.7),
+             (cos(back2) * size * 0.7, sin(back2) * size * 0.7))
+
+    def hull_cached(values):
+        get_hull = ship.get_hull
+        for angle in values:
+            get_hull(angle)
+
+    def outline_math(values):
+        for rotation in values:
+            rotation_rad = radians(rotation)
+            [(x * cos(rotation_rad) - y * sin(rotation_rad),
+              x * sin(rotation_rad) + y * cos(rotation_rad))
+             for x, y in points]
+
+    def outline_hoisted(values):
+        for rotation in values:
+            rotation_rad = radians(rotation)
+            cos_r = cos(rotation_rad)
+            sin_r = sin(rotation_rad)
+            [(x * cos_r - y * sin_r, x * sin_r + y * cos_r)
+             for x, y in points]
+
+    def timed(function, values):
+        start = time.perf_counter()
+        function(values)
+        return (time.perf_counter() - start) / len(values) * 1e9
+
+    def max_error(values):
+        error = 0.0
+        for angle in values:
+            cos_a, sin_a = angles.unit(angle)
+            angle_rad = radians(angle)
+            error = max(error, abs(cos_a - cos(angle_rad)),
+                        abs(sin_a - sin(angle_rad)))
+        return error
+
+    cases = [
+        ("rumbo de la nave", heading_math, heading_table, headings),
+        ("ángulo arbitrario", heading_math, float_table, floats),
+        ("casco de la nave", hull_math, hull_cached, headings),
+        ("contorno asteroide", outline_math, outline_hoisted, floats),
+    ]
+    errors = {"rumbo de la nave": max_error(headings),
+              "ángulo arbitrario": max_error(floats)}
+
+    results = {}
+    for name, with_math, with_tables, values in cases:
+        math_ns = min(timed(with_math, values) for _ in range(3))
+        table_ns = min(timed(with_tables, values) for _ in range(3))
+        results[name] = {"math_ns": math_ns, "table_ns": table_ns,
+                         "max_error": errors.get(name)}
+        line = (f"{name:<20} antes {math_ns:7.1f} ns  "
+                f"después {table_ns:7.1f} ns  ({math_ns / table_ns:.2f}x)")
+        if name in errors:
+            line += f"  error máx {errors[name]:.1e}"
+        print(line)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Listar los casos cuyo rendimiento empeoró más que `tolerance`.
+
+    Se compara la mediana del tiempo de frame, menos ruidosa que la media.
+    """
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get("results", {}).get(key)
+        if base is None:
+            continue
+        before = base["phases_ms"]["total"]["p50"]
+        after = result["phases_ms"]["total"]["p50"]
+        change = after / before - 1
+        status = "REGRESIÓN" if change > tolerance else "ok"
+        print(f"{key:<18} {before:8.2f} -> {after:8.2f} ms/frame "
+              f"({change:+.1%}) {status}")
+        if change > tolerance:
+            regressions.append(key)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de Asteroids")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES,
+                        help="número de asteroides y balas por caso")
+    parser.add_argument("--render-modes", nargs="+", default=RENDER_MODES,
+                        choices=RENDER_MODES)
+    parser.add_argument("--frames", type=int, default=120,
+                        help="frames medidos por caso")
+    parser.add_argument("--screens", nargs="*", default=SCREENS,
+                        choices=SCREENS,
+                        help="pantallas fuera de la partida a medir")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="repeticiones por caso (se toma la mediana)")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--array-store", action="store_true",
+                        help="usar el almacén de entidades en arrays NumPy")
+    parser.add_argument("--out", default="bench_results.json",
+                        help="archivo JSON de resultados")
+    parser.add_argument("--baseline", default="bench_baseline.json",
+                        help="línea base con la que comparar")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="guardar los resultados como nueva línea base")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="aumento tolerado del tiempo de frame mediano")
+    parser.add_argument("--trig", action="store_true",
+                        help="sólo medir las tablas de angles.py frente a math")
+    args = parser.parse_args(argv)
+
+    if args.trig:
+        bench_trig(seed=args.seed)
+        return 0
+
+    pygame.init()
+    from game import Game
+    game = Game(array_store=args.array_store)
+
+    results = {}
+    for count in args.sizes:
+        for render_mode in args.render_modes:
+            key = f"{count}/{render_mode}"
+            result = median_run([
+                run_case(game, count, render_mode, args.frames, args.seed)
+                for _ in range(max(1, args.repeat))])
+            results[key] = result
+            phases = result["phases_ms"]
+            print(f"{key:<18} {result['fps']:10.1f} frames/s  "
+                  f"update {phases['update']['p50']:.2f} ms  "
+                  f"collisions {phases['collisions']['p50']:.2f} ms  "
+                  f"draw {phases['draw']['p50']:.2f} ms  "
+                  f"peak {result['peak_kb']:.0f} KB")
+
+    # Pantallas fuera de la partida, con una tabla de puntuaciones propia
+    if args.screens:
+        player_scores = game.high_scores
+        with tempfile.TemporaryDirectory() as directory:
+            game.high_scores = fill_high_scores(directory, args.seed)
+            try:
+                for screen in args.screens:
+                    key = f"screen/{screen}"
+                    result = median_run([
+                        run_screen(game, screen, args.frames, args.seed)
+                        for _ in range(max(1, args.repeat))])
+                    results[key] = result
+                    phases = result["phases_ms"]
+                    print(f"{key:<18} {result['fps']:10.1f} frames/s  "
+                          f"draw {phases['draw']['p50']:.2f} ms  "
+                          f"p99 {phases['total']['p99']:.2f} ms")
+            finally:
+                game.high_scores.close()
+                game.high_scores = player_scores
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "frames": args.frames,
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "array_store": args.array_store,
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+
+    pygame.quit()
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Línea base guardada en {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""
+Broadphase de colisiones para Asteroids: rejilla uniforme sobre el toro
+"""
+
+from constants import WINDOW_WIDTH, WINDOW_HEIGHT, GRID_CELL_SIZE
+
+
+def wrap_delta(delta, span):
+    """Diferencia más corta sobre un eje con wraparound"""
+    delta = delta % span
+    if delta > span / 2:
+        delta -= span
+    return delta
+
+
+def wrap_lerp(previous, current, alpha, span):
+    """Interpolar sobre un eje con wraparound, por el camino más corto"""
+    return previous + wrap_delta(current - previous, span) * alpha
+
+
+def wrapped_distance_sq(x1, y1, x2, y2):
+    """Distancia al cuadrado entre dos puntos teniendo en cuenta los bordes"""
+    dx = wrap_delta(x1 - x2, WINDOW_WIDTH)
+    dy = wrap_delta(y1 - y2, WINDOW_HEIGHT)
+    return dx * dx + dy * dy
+
+
+def segment_circle_hit(x, y, step_x, step_y, cx, cy, radius):
+    """Barrido contra un círculo.
+
+    El segmento termina en (x, y) y recorrió (step_x, step_y) en el frame,
+    medido respecto al círculo (velocidad propia menos la del círculo). Los
+    extremos se comparan con wraparound.
+    """
+    end_x = wrap_delta(x - cx, WINDOW_WIDTH)
+    end_y = wrap_delta(y - cy, WINDOW_HEIGHT)
+    start_x = end_x - step_x
+    start_y = end_y - step_y
+
+    # Punto del segmento más cercano al centro
+    length_sq = step_x * step_x + step_y * step_y
+    t = 1.0
+    if length_sq > 0:
+        t = -(start_x * step_x + start_y * step_y) / length_sq
+        if t < 0.0:
+            t = 0.0
+        elif t > 1.0:
+            t = 1.0
+    near_x = start_x + t * step_x
+    near_y = start_y + t * step_y
+    return near_x * near_x + near_y * near_y < radius * radius
+
+
+def segment_box_hit(x, y, step_x, step_y, cx, cy, half_width, half_height):
+    """Barrido contra una caja centrada en (cx, cy), por planos (slabs).
+
+    Mismas convenciones que segment_circle_hit pero sin wraparound: las
+    cajas son de UFOs, que entran y salen por los bordes sin envolver. Para
+    un objeto con tamaño se agranda la caja con su mitad.
+    """
+    end_x = x - cx
+    end_y = y - cy
+    t_enter = 0.0
+    t_exit = 1.0
+    for end, step, half in ((end_x, step_x, half_width),
+                            (end_y, step_y, half_height)):
+        start = end - step
+        if step == 0:
+            if start <= -half or start >= half:
+                return False
+            continue
+        t0 = (-half - start) / step
+        t1 = (half - start) / step
+        if t0 > t1:
+            t0, t1 = t1, t0
+        if t0 > t_enter:
+            t_enter = t0
+        if t1 < t_exit:
+            t_exit = t1
+        if t_enter >= t_exit:
+            return False
+    return True
+
+
+class SpatialGrid:
+    """Rejilla uniforme que envuelve los bordes de la pantalla.
+
+    Cada objeto se inserta en todas las celdas que toca su círculo
+    envolvente, así una consulta sólo revisa los vecinos cercanos en
+    lugar de todos los objetos del nivel.
+    """
+
+    def __init__(self, cell_size=GRID_CELL_SIZE,
+                 width=WINDOW_WIDTH, height=WINDOW_HEIGHT):
+        # Ajustar las celdas para que dividan exactamente la pantalla,
+        # así el índice de una coordenada sin envolver es correcto
+        self.cols = max(1, int(width // cell_size))
+        self.rows = max(1, int(height // cell_size))
+        self.cell_width = width / self.cols
+        self.cell_height = height / self.rows
+        self.cells = [[] for _ in range(self.cols * self.rows)]
+        self.used = []
+
+    def clear(self):
+        """Vaciar sólo las celdas ocupadas en el frame anterior"""
+        cells = self.cells
+        for index in self.used:
+            cells[index].clear()
+        self.used.clear()
+
+    def insert(self, obj, x, y, radius):
+        """Insertar un objeto con su círculo envolvente"""
+        cells = self.cells
+        for index in self._cells_for(x, y, radius):
+            bucket = cells[index]
+            if not bucket:
+                self.used.append(index)
+            bucket.append(obj)
+
+    def query(self, x, y, radius=0):
+        """Candidatos cuyas celdas tocan el círculo (x, y, radius).
+
+        Si la consulta cae en una sola celda se devuelve la propia lista de
+        la celda, sin copiarla; no debe modificarse.
+        """
+        cells = self.cells
+        indices = self._cells_for(x, y, radius)
+        if len(indices) == 1:
+            return cells[indices[0]]
+
+        found = []
+        seen = set()
+        for index in indices:
+            for obj in cells[index]:
+                key = id(obj)
+                if key not in seen:
+                    seen.add(key)
+                    found.append(obj)
+        return found
+
+    def _cells_for(self, x, y, radius):
+        cols = self.cols
+        rows = self.rows
+        x0 = int((x - radius) // self.cell_width)
+        x1 = int((x + radius) // self.cell_width)
+        y0 = int((y - radius) // self.cell_height)
+        y1 = int((y + radius) // self.cell_height)
+
+        # Caso común: el círculo cabe en una sola celda
+        if x0 == x1 and y0 == y1:
+            return [(y0 % rows) * cols + x0 % cols]
+
+        # Un objeto más grande que la pantalla toca todas las columnas/filas
+        if x1 - x0 + 1 >= cols:
+            xs = range(cols)
+        else:
+            xs = [cx % cols for cx in range(x0, x1 + 1)]
+        if y1 - y0 + 1 >= rows:
+            ys = range(rows)
+        else:
+            ys = [cy % rows for cy in range(y0, y1 + 1)]
+
+        return [cy * cols + cx for cy in ys for cx in xs]
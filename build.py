@@ -1,43 +1,137 @@
 #!/usr/bin/env python3
 """
 Script para construir el ejecutable de Asteroids
+
+Perfiles:
+  default    ejecutable como hasta ahora
+  optimized  bytecode precompilado con -OO y sin los módulos que el juego
+             no usa
+
+Con --onedir se genera una carpeta en vez de un solo archivo, que no tiene
+que descomprimirse en cada arranque. Después de construir se mide el tamaño
+del resultado y su tiempo de arranque hasta el primer frame.
 """
+import argparse
 import os
 import sys
 import subprocess
 import platform
+import statistics
+import time
+
+# Módulos que el juego no usa. pygame importa numpy (surfarray) y
+# pkg_resources (datos del paquete) si están instalados, y son lo más lento
+# de su arranque; sin numpy no están disponibles --array-store ni el dibujo
+# por lotes (batch.py); numba, opcional para éste, tampoco se incluye.
+OPTIMIZED_EXCLUDES = [
+    "numpy",
+    "numba",
+    "pkg_resources",
+    "setuptools",
+    "pygame.examples",
+    "pygame.tests",
+    "pygame.docs",
+    "tkinter",
+    "unittest",
+    "doctest",
+    "pydoc",
+    "xmlrpc",
+    "lib2to3",
+]
+
+# --optimize (perfil optimized) existe desde PyInstaller 6.6
+PYINSTALLER_MIN_VERSION = (6, 6)
+
+
+def parse_args(argv=None):
+    """Opciones de construcción"""
+    parser = argparse.ArgumentParser(
+        description="Construir el ejecutable de Asteroids")
+    parser.add_argument("--profile", choices=("default", "optimized"),
+                        default="default", help="perfil de construcción")
+    parser.add_argument("--onedir", action="store_true",
+                        help="generar una carpeta en vez de un solo archivo")
+    parser.add_argument("--name", default="Asteroids",
+                        help="nombre del ejecutable")
+    parser.add_argument("--runs", type=int, default=5,
+                        help="arranques a medir tras construir")
+    parser.add_argument("--no-measure", action="store_true",
+                        help="no medir tamaño ni arranque")
+    return parser.parse_args(argv)
 
 
 def install_pyinstaller():
-    """Instala PyInstaller si no está disponible"""
+    """Instala PyInstaller, o lo actualiza si es anterior a la versión
+    mínima"""
+    requirement = "pyinstaller>=" + ".".join(
+        str(part) for part in PYINSTALLER_MIN_VERSION)
     try:
         import PyInstaller
-        print("PyInstaller ya está instalado")
     except ImportError:
         print("Instalando PyInstaller...")
-        subprocess.check_call(
-            [sys.executable, "-m", "pip", "install", "pyinstaller"])
+    else:
+        if _version_tuple(PyInstaller.__version__) >= PYINSTALLER_MIN_VERSION:
+            print(f"PyInstaller {PyInstaller.__version__} ya está instalado")
+            return
+        print(f"Actualizando PyInstaller {PyInstaller.__version__}...")
+    subprocess.check_call(
+        [sys.executable, "-m", "pip", "install", requirement])
 
 
-def build_executable():
-    """Construye el ejecutable usando PyInstaller"""
-    system = platform.system()
+def _version_tuple(version):
+    """Tupla (mayor, menor) de una versión como 6.10.0 o 6.6.dev0"""
+    parts = []
+    for part in version.split(".")[:2]:
+        digits = ""
+        for char in part:
+            if not char.isdigit():
+                break
+            digits += char
+        parts.append(int(digits or 0))
+    return tuple(parts)
 
-    # Comando base de PyInstaller
+
+def build_command(args, system):
+    """Comando de PyInstaller para el perfil elegido"""
     cmd = [
         "pyinstaller",
-        "--onefile",  # Un solo archivo ejecutable
+        "--onedir" if args.onedir else "--onefile",
         "--windowed",  # Sin consola (para juegos)
-        "--name", "Asteroids",
+        "--noconfirm",
+        "--name", args.name,
         "--icon", "icon.ico" if system == "Windows" else "icon.icns",
-        "main.py"
     ]
 
+    if args.profile == "optimized":
+        # Bytecode -OO (sin asserts ni docstrings), PyInstaller 6.6 o
+        # superior (ver install_pyinstaller)
+        cmd.extend(["--optimize", "2"])
+        for module in OPTIMIZED_EXCLUDES:
+            cmd.extend(["--exclude-module", module])
+
     # Agregar archivos de datos si existen
     if os.path.exists("assets"):
         cmd.extend(["--add-data", "assets:assets"])
 
-    print(f"Construyendo ejecutable para {system}...")
+    cmd.append("main.py")
+    return cmd
+
+
+def executable_path(args, system):
+    """Ruta del ejecutable generado"""
+    exe_name = args.name + (".exe" if system == "Windows" else "")
+    if args.onedir:
+        return os.path.join("dist", args.name, exe_name)
+    return os.path.join("dist", exe_name)
+
+
+def build_executable(args):
+    """Construye el ejecutable usando PyInstaller"""
+    system = platform.system()
+    cmd = build_command(args, system)
+
+    print(f"Construyendo ejecutable para {system} "
+          f"(perfil {args.profile}, {'carpeta' if args.onedir else 'un archivo'})...")
     print(f"Comando: {' '.join(cmd)}")
 
     try:
@@ -45,19 +139,73 @@ def build_executable():
         print("¡Ejecutable creado exitosamente!")
 
         # Mostrar ubicación del ejecutable
-        if system == "Windows":
-            exe_path = os.path.join("dist", "Asteroids.exe")
-        else:
-            exe_path = os.path.join("dist", "Asteroids")
-
+        exe_path = executable_path(args, system)
         if os.path.exists(exe_path):
             print(f"Ejecutable ubicado en: {exe_path}")
+        return exe_path
 
     except subprocess.CalledProcessError as e:
         print(f"Error al construir el ejecutable: {e}")
         sys.exit(1)
 
 
+def artifact_size(path):
+    """Tamaño en bytes de un archivo o de todo el contenido de una carpeta"""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+def measure_startup(exe_path, runs):
+    """Segundos hasta el primer frame de cada arranque.
+
+    El juego sale solo tras presentar el primer frame. La primera medición
+    es el arranque en frío (incluye descomprimir en --onefile).
+    """
+    env = dict(os.environ)
+    if platform.system() == "Linux" and not (
+            env.get("DISPLAY") or env.get("WAYLAND_DISPLAY")):
+        env["SDL_VIDEODRIVER"] = "dummy"  # sin pantalla, p. ej. en CI
+
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([exe_path, "--exit-after-first-frame"], env=env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       check=True, timeout=60)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def report(args, exe_path):
+    """Mostrar tamaño y tiempos de arranque del artefacto"""
+    artifact = os.path.dirname(exe_path) if args.onedir else exe_path
+    size = artifact_size(artifact)
+    print(f"Artefacto: {artifact} ({size / (1024 * 1024):.1f} MB)")
+
+    if args.runs <= 0:
+        return
+    try:
+        times = measure_startup(exe_path, args.runs)
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"No se pudo medir el arranque: {e}")
+        return
+
+    print(f"Arranque en frío: {times[0] * 1000:.0f} ms")
+    if len(times) > 1:
+        warm = times[1:]
+        print(f"Arranque (mediana de {len(warm)}): "
+              f"{statistics.median(warm) * 1000:.0f} ms, "
+              f"mínimo {min(warm) * 1000:.0f} ms")
+
+
 if __name__ == "__main__":
+    args = parse_args()
     install_pyinstaller()
-    build_executable()
+    exe_path = build_executable(args)
+    if not args.no_measure and exe_path and os.path.exists(exe_path):
+        report(args, exe_path)
@@ -0,0 +1,11 @@
+"""
+Configuración de pytest para Asteroids
+
+Las pruebas importan los módulos del juego desde la raíz del repositorio y
+usan los drivers "dummy" de SDL para funcionar sin pantalla ni sonido.
+"""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
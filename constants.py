@@ -21,6 +21,8 @@ MAX_BULLETS = 4
 ASTEROID_SPEEDS = [0.5, 1.0, 1.5]  # velocidades por tamaño
 ASTEROID_SIZES = [30, 20, 10]  # tamaños (grande, mediano, pequeño)
 ASTEROID_POINTS = [20, 50, 100]  # puntos por tamaño
+ASTEROID_SHAPE_TEMPLATES = 16  # formas precalculadas por tamaño
+ASTEROID_SHAPE_SEED = 0  # semilla del catálogo de formas (shapes.py)
 
 # Configuración de UFOs
 UFO_SPAWN_CHANCE = 0.001  # Probabilidad por frame
@@ -28,10 +30,28 @@ UFO_SPEED = 2
 UFO_SHOOT_CHANCE = 0.02  # Probabilidad por frame de disparo
 UFO_POINTS = 500
 
+# Tablas trigonométricas (angles.py)
+ANGLE_STEPS_PER_DEGREE = 10  # resolución de 0.1 grados
+
+# Configuración de colisiones
+GRID_CELL_SIZE = 60  # tamaño de celda de la rejilla de broadphase
+
 # Configuración visual
 NUM_STARS = 100
+ASTEROID_SPRITE_ANGLES = 32  # fotogramas de rotación por forma
+ASTEROID_SPRITE_CACHE_SIZE = 256  # formas guardadas en la caché LRU
 INVULNERABILITY_TIME = 120  # frames (2 segundos a 60 FPS)
 
+# Rectángulos sucios: por encima de estos límites se hace un flip completo
+DIRTY_RECT_MAX = 64
+DIRTY_RECT_MAX_COVERAGE = 0.5  # fracción de la pantalla
+
+# Perfilador de frames
+PROFILER_HISTORY = 600  # frames guardados en el buffer circular (10 s)
+
+# Tabla de puntuaciones
+SCORES_PAGE_SIZE = 10  # filas visibles al desplazarse
+
 # Colores
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -40,6 +60,11 @@ YELLOW = (255, 255, 100)
 GRAY = (128, 128, 128)
 GREEN = (100, 255, 100)
 
+# Bucle principal: pasos fijos de simulación, dibujo a su propio ritmo
+SIMULATION_RATE = 60  # pasos de simulación por segundo
+RENDER_FPS = 60  # límite de frames dibujados por segundo (0 = sin límite)
+MAX_FRAME_SKIP = 5  # pasos máximos por frame dibujado antes de descartar
+
 # Configuración del juego
 INITIAL_LIVES = 3
 INITIAL_ASTEROIDS = 6
@@ -0,0 +1,65 @@
+"""
+Actualización de pantalla por rectángulos sucios para Asteroids
+
+En lugar de limpiar y voltear toda la pantalla, se borran con el fondo sólo
+las zonas donde había algo dibujado en el frame anterior y se envían a
+pygame.display.update() las zonas del frame anterior y del actual. Si hay
+demasiados rectángulos o cubren gran parte de la pantalla se vuelve a un
+flip completo, que en ese caso es más barato.
+"""
+
+import pygame
+from constants import *
+
+
+class DirtyRectTracker:
+    def __init__(self, max_rects=DIRTY_RECT_MAX,
+                 max_coverage=DIRTY_RECT_MAX_COVERAGE):
+        self.max_rects = max_rects
+        self.max_area = WINDOW_WIDTH * WINDOW_HEIGHT * max_coverage
+        self.previous = []
+        self.full_redraw = True
+        self.full_flips = 0
+        self.partial_updates = 0
+
+    def invalidate(self):
+        """Forzar un frame completo (cambio de pantalla, de modo, etc.)"""
+        self.full_redraw = True
+
+    def erase(self, screen, background):
+        """Restaurar el fondo bajo lo dibujado en el frame anterior"""
+        for rect in self.previous:
+            screen.blit(background, rect, rect)
+
+    def present(self, rects):
+        """Mostrar el frame actualizando sólo las zonas que cambiaron"""
+        drawn = [rect.inflate(2, 2) for rect in rects if rect]
+
+        if self.full_redraw:
+            pygame.display.flip()
+            self.full_flips += 1
+        else:
+            dirty = merge_rects(self.previous + drawn)
+            area = sum(rect.width * rect.height for rect in dirty)
+            if len(dirty) > self.max_rects or area > self.max_area:
+                pygame.display.flip()
+                self.full_flips += 1
+            else:
+                pygame.display.update(dirty)
+                self.partial_updates += 1
+
+        self.previous = drawn
+        self.full_redraw = False
+
+
+def merge_rects(rects):
+    """Unir los rectángulos que se solapan hasta que no quede ninguno"""
+    merged = []
+    for rect in rects:
+        rect = rect.copy()
+        index = rect.collidelist(merged)
+        while index != -1:
+            rect.union_ip(merged.pop(index))
+            index = rect.collidelist(merged)
+        merged.append(rect)
+    return merged
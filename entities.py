@@ -1,11 +1,25 @@
 """
 Entidades del juego Asteroids: Ship, Bullet, Asteroid, UFO
+
+La física y la geometría no dependen de pygame, así la misma simulación
+sirve al juego de escritorio y a la versión móvil (Kivy). pygame sólo se
+usa en los métodos draw.
 """
 
-import pygame
+try:
+    import pygame  # sólo para dibujar
+except ImportError:
+    pygame = None
 import math
 import random
+import angles
+from angles import UNIT, STEPS
 from constants import *
+from broadphase import wrap_lerp
+from shapes import CATALOGUE
+
+# Casco de la nave relativo al centro, por (índice de rumbo, tamaño)
+_ship_hulls = {}
 
 
 class Ship:
@@ -16,6 +30,13 @@ class Ship:
         self.vel_x = 0
         self.vel_y = 0
         self.size = SHIP_SIZE
+        self.save_previous()
+
+    def save_previous(self):
+        """Recordar el estado antes del paso, para interpolar al dibujar"""
+        self.prev_x = self.x
+        self.prev_y = self.y
+        self.prev_angle = self.angle
 
     def rotate_left(self):
         self.angle -= 5
@@ -24,9 +45,10 @@ class Ship:
         self.angle += 5
 
     def accelerate(self):
-        angle_rad = math.radians(self.angle)
-        self.vel_x += math.cos(angle_rad) * SHIP_THRUST
-        self.vel_y += math.sin(angle_rad) * SHIP_THRUST
+        # El rumbo es entero: índice exacto de la tabla, sin redondear
+        cos_a, sin_a = UNIT[self.angle * ANGLE_STEPS_PER_DEGREE % STEPS]
+        self.vel_x += cos_a * SHIP_THRUST
+        self.vel_y += sin_a * SHIP_THRUST
 
         # Limitar velocidad máxima
         speed = math.sqrt(self.vel_x**2 + self.vel_y**2)
@@ -48,9 +70,9 @@ class Ship:
         self.y = self.y % WINDOW_HEIGHT
 
     def get_tip(self):
-        angle_rad = math.radians(self.angle)
-        tip_x = self.x + math.cos(angle_rad) * self.size
-        tip_y = self.y + math.sin(angle_rad) * self.size
+        cos_a, sin_a = UNIT[self.angle * ANGLE_STEPS_PER_DEGREE % STEPS]
+        tip_x = self.x + cos_a * self.size
+        tip_y = self.y + sin_a * self.size
         return tip_x, tip_y
 
     def reset_position(self):
@@ -59,37 +81,78 @@ class Ship:
         self.y = WINDOW_HEIGHT // 2
         self.vel_x = 0
         self.vel_y = 0
+        self.save_previous()  # sin interpolar el salto al centro
+
+    def get_position(self, alpha=1.0):
+        """Posición entre el paso anterior (alpha 0) y el actual (alpha 1)"""
+        return (wrap_lerp(self.prev_x, self.x, alpha, WINDOW_WIDTH),
+                wrap_lerp(self.prev_y, self.y, alpha, WINDOW_HEIGHT))
+
+    def get_outline(self, alpha=1.0):
+        """Vértices del casco en coordenadas de pantalla"""
+        x, y = self.get_position(alpha)
+        angle = self.prev_angle + (self.angle - self.prev_angle) * alpha
+        return [(x + dx, y + dy) for dx, dy in self.get_hull(angle)]
+
+    def get_hull(self, angle):
+        """Vértices del casco relativos al centro, calculados una vez por
+        rumbo cuantizado"""
+        key = (angles.index(angle), self.size)
+        hull = _ship_hulls.get(key)
+        if hull is None:
+            angle_rad = math.radians(key[0] / ANGLE_STEPS_PER_DEGREE)
 
-    def draw(self, screen):
-        angle_rad = math.radians(self.angle)
+            # Punto frontal
+            tip_x = math.cos(angle_rad) * self.size
+            tip_y = math.sin(angle_rad) * self.size
 
-        # Punto frontal
-        tip_x = self.x + math.cos(angle_rad) * self.size
-        tip_y = self.y + math.sin(angle_rad) * self.size
+            # Puntos traseros
+            back_angle1 = angle_rad + 2.8
+            back_angle2 = angle_rad - 2.8
 
-        # Puntos traseros
-        back_angle1 = angle_rad + 2.8
-        back_angle2 = angle_rad - 2.8
+            back1_x = math.cos(back_angle1) * (self.size * 0.7)
+            back1_y = math.sin(back_angle1) * (self.size * 0.7)
 
-        back1_x = self.x + math.cos(back_angle1) * (self.size * 0.7)
-        back1_y = self.y + math.sin(back_angle1) * (self.size * 0.7)
+            back2_x = math.cos(back_angle2) * (self.size * 0.7)
+            back2_y = math.sin(back_angle2) * (self.size * 0.7)
 
-        back2_x = self.x + math.cos(back_angle2) * (self.size * 0.7)
-        back2_y = self.y + math.sin(back_angle2) * (self.size * 0.7)
+            hull = ((tip_x, tip_y), (back1_x, back1_y), (back2_x, back2_y))
+            _ship_hulls[key] = hull
+        return hull
 
-        points = [(tip_x, tip_y), (back1_x, back1_y), (back2_x, back2_y)]
-        pygame.draw.polygon(screen, WHITE, points, 1)
+    def draw(self, screen, alpha=1.0):
+        return pygame.draw.polygon(screen, WHITE, self.get_outline(alpha), 1)
 
 
 class Bullet:
+    __slots__ = ("x", "y", "vel_x", "vel_y", "lifetime", "is_ufo_bullet",
+                 "prev_x", "prev_y")
+
     def __init__(self, x, y, angle, is_ufo_bullet=False):
+        self.reset(x, y, angle, is_ufo_bullet)
+
+    def reset(self, x, y, angle, is_ufo_bullet=False):
+        """Reinicializar la bala para reutilizarla desde un pool"""
         self.x = x
         self.y = y
-        angle_rad = math.radians(angle)
-        self.vel_x = math.cos(angle_rad) * BULLET_SPEED
-        self.vel_y = math.sin(angle_rad) * BULLET_SPEED
+        if is_ufo_bullet:
+            # Puntería del UFO: ángulo arbitrario
+            angle_rad = math.radians(angle)
+            cos_a = math.cos(angle_rad)
+            sin_a = math.sin(angle_rad)
+        else:
+            # Rumbo entero de la nave: índice exacto de la tabla
+            cos_a, sin_a = UNIT[angle * ANGLE_STEPS_PER_DEGREE % STEPS]
+        self.vel_x = cos_a * BULLET_SPEED
+        self.vel_y = sin_a * BULLET_SPEED
         self.lifetime = BULLET_LIFETIME
         self.is_ufo_bullet = is_ufo_bullet
+        self.prev_x = x
+        self.prev_y = y
+
+    def save_previous(self):
+        self.prev_x = self.x
+        self.prev_y = self.y
 
     def update(self):
         self.x += self.vel_x
@@ -102,33 +165,71 @@ class Bullet:
 
         return self.lifetime > 0
 
-    def draw(self, screen):
+    def get_step(self):
+        """Desplazamiento del último update (cero si aún no se movió)"""
+        if self.lifetime < BULLET_LIFETIME:
+            return self.vel_x, self.vel_y
+        return 0.0, 0.0
+
+    def get_position(self, alpha=1.0):
+        return (wrap_lerp(self.prev_x, self.x, alpha, WINDOW_WIDTH),
+                wrap_lerp(self.prev_y, self.y, alpha, WINDOW_HEIGHT))
+
+    def draw(self, screen, alpha=1.0):
+        x, y = self.get_position(alpha)
         color = RED if self.is_ufo_bullet else WHITE
-        pygame.draw.circle(screen, color, (int(self.x), int(self.y)), 2)
+        return pygame.draw.circle(screen, color, (int(x), int(y)), 2)
 
 
 class Asteroid:
-    def __init__(self, x, y, size_index):
+    __slots__ = ("rng", "x", "y", "size_index", "size", "vel_x", "vel_y",
+                 "rotation", "rotation_speed", "template",
+                 "prev_x", "prev_y", "prev_rotation", "hull", "hull_rotation")
+
+    def __init__(self, x, y, size_index, rng=random):
+        self.reset(x, y, size_index, rng)
+
+    def reset(self, x, y, size_index, rng=random):
+        """Reinicializar el asteroide para reutilizarlo desde un pool"""
+        self.rng = rng  # generador aleatorio de la partida
         self.x = x
         self.y = y
         self.size_index = size_index
         self.size = ASTEROID_SIZES[size_index]
-        self.vel_x = random.uniform(
+        self.vel_x = self.rng.uniform(
             -ASTEROID_SPEEDS[size_index], ASTEROID_SPEEDS[size_index])
-        self.vel_y = random.uniform(
+        self.vel_y = self.rng.uniform(
             -ASTEROID_SPEEDS[size_index], ASTEROID_SPEEDS[size_index])
         self.rotation = 0
-        self.rotation_speed = random.uniform(-1, 1)
-
-        # Crear forma poligonal irregular
-        self.points = []
-        num_points = random.randint(6, 10)
-        for i in range(num_points):
-            angle = (2 * math.pi * i) / num_points
-            radius = self.size * random.uniform(0.8, 1.2)
-            point_x = radius * math.cos(angle)
-            point_y = radius * math.sin(angle)
-            self.points.append((point_x, point_y))
+        self.rotation_speed = self.rng.uniform(-1, 1)
+        self.prev_x = x
+        self.prev_y = y
+        self.prev_rotation = 0
+
+        # Forma irregular: índice de una plantilla del catálogo compartido
+        self.template = self.rng.randrange(
+            len(CATALOGUE.templates[size_index]))
+        self.hull = None
+        self.hull_rotation = None
+
+    @property
+    def shape(self):
+        return CATALOGUE.templates[self.size_index][self.template]
+
+    @property
+    def points(self):
+        """Vértices locales de la forma (compartidos, no modificar)"""
+        return CATALOGUE.templates[self.size_index][self.template].points
+
+    @property
+    def shape_id(self):
+        """Clave de la forma para las cachés de sprites y de vértices"""
+        return (self.size_index, self.template)
+
+    def save_previous(self):
+        self.prev_x = self.x
+        self.prev_y = self.y
+        self.prev_rotation = self.rotation
 
     def update(self):
         self.x += self.vel_x
@@ -139,35 +240,59 @@ class Asteroid:
         self.x = self.x % WINDOW_WIDTH
         self.y = self.y % WINDOW_HEIGHT
 
-    def draw(self, screen):
-        rotated_points = []
-        rotation_rad = math.radians(self.rotation)
-
-        for point_x, point_y in self.points:
-            # Rotar el punto
-            rotated_x = point_x * \
-                math.cos(rotation_rad) - point_y * math.sin(rotation_rad)
-            rotated_y = point_x * \
-                math.sin(rotation_rad) + point_y * math.cos(rotation_rad)
-
-            # Trasladar a la posición del asteroide
-            final_x = rotated_x + self.x
-            final_y = rotated_y + self.y
-
-            rotated_points.append((final_x, final_y))
-
-        pygame.draw.polygon(screen, WHITE, rotated_points, 1)
+    def get_position(self, alpha=1.0):
+        return (wrap_lerp(self.prev_x, self.x, alpha, WINDOW_WIDTH),
+                wrap_lerp(self.prev_y, self.y, alpha, WINDOW_HEIGHT))
+
+    def get_hull(self):
+        """Vértices rotados relativos al centro.
+
+        Se calculan una vez por paso de simulación, cuando cambia la
+        rotación, y los comparten las colisiones y el dibujo.
+        """
+        rotation = self.rotation
+        if rotation != self.hull_rotation:
+            # Un seno y un coseno por asteroide, no cuatro por vértice
+            rotation_rad = math.radians(rotation)
+            cos_r = math.cos(rotation_rad)
+            sin_r = math.sin(rotation_rad)
+            self.hull = [(point_x * cos_r - point_y * sin_r,
+                          point_x * sin_r + point_y * cos_r)
+                         for point_x, point_y in self.points]
+            self.hull_rotation = rotation
+        return self.hull
+
+    def get_outline(self, alpha=1.0):
+        """Polígono rotado en coordenadas de pantalla.
+
+        Sólo se interpola la posición: la rotación es la del paso actual (a
+        lo sumo 1 grado por paso) para reutilizar el casco de las colisiones.
+        """
+        x, y = self.get_position(alpha)
+        return [(x + dx, y + dy) for dx, dy in self.get_hull()]
+
+    def draw(self, screen, alpha=1.0):
+        return pygame.draw.polygon(screen, WHITE, self.get_outline(alpha), 1)
 
     def get_collision_radius(self):
-        return self.size * 0.8
-
-    def split(self):
-        """Dividir asteroide en asteroides más pequeños"""
+        """Radio del círculo envolvente: descarte rápido antes de la prueba
+        exacta contra el casco"""
+        return CATALOGUE.templates[self.size_index][self.template].radius
+
+    def split(self, factory=None):
+        """Dividir asteroide en asteroides más pequeños.
+
+        `factory(x, y, size_index, rng)` crea los fragmentos, por ejemplo
+        desde un pool; por defecto se usa la propia clase.
+        """
+        if factory is None:
+            factory = type(self)
         if self.size_index < 2:
             asteroids = []
             for _ in range(2):
-                new_asteroid = Asteroid(self.x, self.y, self.size_index + 1)
-                angle = random.uniform(0, 360)
+                new_asteroid = factory(
+                    self.x, self.y, self.size_index + 1, self.rng)
+                angle = self.rng.uniform(0, 360)
                 speed = ASTEROID_SPEEDS[self.size_index + 1]
                 new_asteroid.vel_x = math.cos(math.radians(angle)) * speed
                 new_asteroid.vel_y = math.sin(math.radians(angle)) * speed
@@ -177,9 +302,11 @@ class Asteroid:
 
 
 class UFO:
-    def __init__(self):
+    def __init__(self, rng=random):
+        self.rng = rng  # generador aleatorio de la partida
+
         # Aparecer desde un lado aleatorio
-        side = random.choice(['left', 'right'])
+        side = self.rng.choice(['left', 'right'])
         if side == 'left':
             self.x = -20
             self.direction = 1
@@ -187,20 +314,25 @@ class UFO:
             self.x = WINDOW_WIDTH + 20
             self.direction = -1
 
-        self.y = random.randint(50, WINDOW_HEIGHT - 50)
+        self.y = self.rng.randint(50, WINDOW_HEIGHT - 50)
         self.vel_x = UFO_SPEED * self.direction
-        self.vel_y = random.uniform(-0.5, 0.5)
+        self.vel_y = self.rng.uniform(-0.5, 0.5)
         self.width = 20
         self.height = 8
         self.shoot_timer = 0
+        self.save_previous()
+
+    def save_previous(self):
+        self.prev_x = self.x
+        self.prev_y = self.y
 
-    def update(self, ship):
+    def update(self, ship, bullet_factory=Bullet):
         self.x += self.vel_x
         self.y += self.vel_y
 
         # Cambiar dirección vertical ocasionalmente
-        if random.random() < 0.01:
-            self.vel_y = random.uniform(-1, 1)
+        if self.rng.random() < 0.01:
+            self.vel_y = self.rng.uniform(-1, 1)
 
         # Mantener dentro de los límites verticales
         if self.y < 20:
@@ -210,29 +342,38 @@ class UFO:
 
         # Disparar ocasionalmente hacia el jugador
         self.shoot_timer += 1
-        if self.shoot_timer > 30 and random.random() < UFO_SHOOT_CHANCE:
+        if self.shoot_timer > 30 and self.rng.random() < UFO_SHOOT_CHANCE:
             self.shoot_timer = 0
             # Calcular ángulo hacia el jugador (con imprecisión)
             dx = ship.x - self.x
             dy = ship.y - self.y
             angle = math.degrees(math.atan2(dy, dx))
             # Agregar imprecisión al disparo
-            angle += random.uniform(-20, 20)
-            return Bullet(self.x, self.y, angle, is_ufo_bullet=True)
+            angle += self.rng.uniform(-20, 20)
+            return bullet_factory(self.x, self.y, angle, is_ufo_bullet=True)
         return None
 
     def is_off_screen(self):
         return self.x < -50 or self.x > WINDOW_WIDTH + 50
 
     def get_collision_rect(self):
-        return pygame.Rect(self.x - self.width//2, self.y - self.height//2,
-                           self.width, self.height)
+        """Caja (izquierda, arriba, ancho, alto), válida como rect de pygame"""
+        return (self.x - self.width//2, self.y - self.height//2,
+                self.width, self.height)
+
+    def get_position(self, alpha=1.0):
+        # Los UFOs no envuelven los bordes: interpolación lineal simple
+        return (self.prev_x + (self.x - self.prev_x) * alpha,
+                self.prev_y + (self.y - self.prev_y) * alpha)
+
+    def draw(self, screen, alpha=1.0):
+        x, y = self.get_position(alpha)
 
-    def draw(self, screen):
         # Dibujar UFO como dos óvalos conectados
-        pygame.draw.ellipse(screen, WHITE,
-                            (self.x - self.width//2, self.y - self.height//4,
-                             self.width, self.height//2), 1)
-        pygame.draw.ellipse(screen, WHITE,
-                            (self.x - self.width//3, self.y - self.height//2,
-                             self.width//1.5, self.height//2), 1)
+        body = pygame.draw.ellipse(screen, WHITE,
+                                   (x - self.width//2, y - self.height//4,
+                                    self.width, self.height//2), 1)
+        dome = pygame.draw.ellipse(screen, WHITE,
+                                   (x - self.width//3, y - self.height//2,
+                                    self.width//1.5, self.height//2), 1)
+        return body.union(dome)
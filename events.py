@@ -0,0 +1,93 @@
+"""
+Bus de eventos de la partida para Asteroids
+
+La simulación anuncia lo que pasa (asteroide destruido, UFO derribado,
+nave alcanzada, nivel superado, fin de la partida) y la puntuación, el
+avance de nivel, el HUD y las estadísticas se suscriben a los tipos que
+les interesan, en lugar de vivir mezclados en la detección de colisiones.
+
+El despacho es síncrono y en orden de suscripción, así la simulación
+sigue siendo determinista. Cada tipo tiene un único registro Event
+preasignado que se rellena en cada emisión: emitir no genera basura, pero
+los suscriptores no deben guardar el evento recibido.
+"""
+
+from constants import ASTEROID_SIZES
+
+# Tipos de evento
+ASTEROID_DESTROYED = 0
+UFO_KILLED = 1
+SHIP_HIT = 2
+LEVEL_CLEARED = 3
+GAME_OVER = 4
+
+EVENT_NAMES = ("asteroid_destroyed", "ufo_killed", "ship_hit",
+               "level_cleared", "game_over")
+
+
+class Event:
+    """Registro reutilizable de un tipo de evento"""
+
+    __slots__ = ("type", "frame", "x", "y", "size_index", "lives", "level")
+
+    def __init__(self, event_type):
+        self.type = event_type
+        self.frame = 0
+        self.x = 0.0
+        self.y = 0.0
+        self.size_index = 0
+        self.lives = 0
+        self.level = 0
+
+
+class EventBus:
+    def __init__(self):
+        self.records = [Event(i) for i in range(len(EVENT_NAMES))]
+        self.subscribers = [[] for _ in EVENT_NAMES]
+
+    def subscribe(self, event_type, handler):
+        """Llamar a `handler(event)` en cada evento del tipo dado"""
+        self.subscribers[event_type].append(handler)
+
+    def unsubscribe(self, event_type, handler):
+        self.subscribers[event_type].remove(handler)
+
+    def emit(self, event_type, frame, x=0.0, y=0.0, size_index=0, lives=0,
+             level=0):
+        """Rellenar el registro del tipo y entregarlo a sus suscriptores"""
+        handlers = self.subscribers[event_type]
+        if not handlers:
+            return
+        event = self.records[event_type]
+        event.frame = frame
+        event.x = x
+        event.y = y
+        event.size_index = size_index
+        event.lives = lives
+        event.level = level
+        for handler in handlers:
+            handler(event)
+
+
+class GameStats:
+    """Contadores de la partida en curso, alimentados por el bus"""
+
+    def __init__(self, bus):
+        self.counts = [0] * len(EVENT_NAMES)
+        self.asteroids_by_size = [0] * len(ASTEROID_SIZES)
+        for event_type in range(len(EVENT_NAMES)):
+            bus.subscribe(event_type, self.count)
+
+    def count(self, event):
+        self.counts[event.type] += 1
+        if event.type == ASTEROID_DESTROYED:
+            self.asteroids_by_size[event.size_index] += 1
+
+    def reset(self):
+        self.counts = [0] * len(EVENT_NAMES)
+        self.asteroids_by_size = [0] * len(ASTEROID_SIZES)
+
+    def as_dict(self):
+        stats = dict(zip(EVENT_NAMES, self.counts))
+        stats["asteroids_by_size"] = list(self.asteroids_by_size)
+        return stats
@@ -3,25 +3,43 @@ Clase principal del juego Asteroids
 """
 
 import pygame
+import functools
+import os
+import struct
 import sys
-import math
+import time
 import random
 from constants import *
-from entities import Ship, Bullet, Asteroid, UFO
 from highscores import HighScores
-
-
-class Game:
-    def __init__(self):
+from sprites import AsteroidSpriteCache
+from layers import CachedLayer, CachedText, TextCache
+from dirty import DirtyRectTracker
+from profiler import FrameProfiler, PHASES
+from simulation import (Simulation, INPUT_LEFT, INPUT_RIGHT,
+                        INPUT_THRUST, INPUT_SHOOT)
+from replay import ReplayRecorder
+from events import ASTEROID_DESTROYED, UFO_KILLED, SHIP_HIT, GAME_OVER
+
+# Rutas de dibujo de asteroides, en el orden en que F2 las alterna
+RENDER_MODES = ("vector", "sprites", "batch")
+
+
+class Game(Simulation):
+    def __init__(self, array_store=False, dirty_rects=False, seed=None,
+                 record_path=None, profile=False, profile_path=None,
+                 startup=None, exit_after_first_frame=False,
+                 fps=RENDER_FPS, max_frame_skip=MAX_FRAME_SKIP):
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("Asteroids")
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 36)
-        self.small_font = pygame.font.Font(None, 24)
-        self.tiny_font = pygame.font.Font(None, 18)
 
-        # Sistema de puntuaciones
-        self.high_scores = HighScores()
+        # Ritmo de dibujo y pasos de simulación permitidos por frame
+        self.fps = fps
+        self.max_frame_skip = max_frame_skip
+
+        # Medición opcional del arranque (ver startup.py y build.py)
+        self.startup = startup
+        self.exit_after_first_frame = exit_after_first_frame
 
         # Crear estrellas de fondo
         self.stars = []
@@ -31,50 +49,145 @@ class Game:
             brightness = random.choice([128, 160, 192, 255])
             self.stars.append((x, y, brightness))
 
-        # Estados del juego
-        self.game_state = "playing"  # "playing", "game_over", "enter_name", "show_scores"
+        # Capas cacheadas: fondo y pantallas estáticas (los textos del HUD
+        # se crean con las fuentes, al dibujarse por primera vez)
+        self.background = CachedLayer(self.render_background)
+        self.game_over_layer = CachedLayer(self.render_game_over)
+        self.name_input_layer = CachedLayer(self.render_name_input)
+        self.high_scores_layer = CachedLayer(self.render_high_scores)
+
+        # Actualización opcional por rectángulos sucios
+        self.dirty = DirtyRectTracker() if dirty_rects else None
+        self.frame_rects = []  # zonas dibujadas en el frame actual
+        self.drawn_state = None
+
+        # Perfilador de frames (F3 muestra la gráfica)
+        self.profiler = FrameProfiler()
+        self.profiler.enabled = profile or profile_path is not None
+        self.profile_path = profile_path
+        self.show_profiler = False
+        self.profiler_lines = []  # textos de la gráfica, renovados cada 30 frames
+
+        # Ruta de dibujo de asteroides (F2 alterna)
+        self.render_mode = "vector"
+        self.draw_times = dict.fromkeys(RENDER_MODES, 0.0)  # ms promedio
+        self.show_render_stats = False
+
+        # Grabación opcional de la partida para repetirla después
+        self.record_path = record_path
+        recorder = ReplayRecorder(array_store) if record_path else None
+        self.pending_inputs = 0  # disparos pulsados desde el último paso
+
+        # Estados del juego: "playing", "game_over", "enter_name", "show_scores"
         self.name_input = ""
 
-        self.reset_game()
+        # Vista de la tabla: desplazamiento, filtro y última puntuación guardada
+        self.scores_offset = 0
+        self.scores_filter = None
+        self.player_name = None
+        self.player_rank = None
+
+        # Textos del HUD: se renuevan sólo tras eventos que cambian
+        # la puntuación o las vidas
+        self.hud_dirty = True
+        self.hud = None
+
+        # La tabla de puntuaciones se carga en segundo plano
+        high_scores = HighScores()
+        high_scores.preload()
+
+        Simulation.__init__(self, array_store, high_scores, seed, recorder,
+                            self.profiler)
+
+        events = self.events
+        for event_type in (ASTEROID_DESTROYED, UFO_KILLED, SHIP_HIT):
+            events.subscribe(event_type, self.invalidate_hud)
+        events.subscribe(GAME_OVER, self.save_replay)
 
-    def reset_game(self):
+    # Fuentes, textos y cachés: se cargan la primera vez que se usan, así
+    # el primer frame no espera por lo que todavía no se dibuja
+
+    @functools.cached_property
+    def font(self):
+        return pygame.font.Font(None, 36)
+
+    @functools.cached_property
+    def small_font(self):
+        return pygame.font.Font(None, 24)
+
+    @functools.cached_property
+    def tiny_font(self):
+        return pygame.font.Font(None, 18)
+
+    @functools.cached_property
+    def score_text(self):
+        return CachedText(self.font, "Score: {}", WHITE)
+
+    @functools.cached_property
+    def lives_text(self):
+        return CachedText(self.font, "Lives: {}", WHITE)
+
+    @functools.cached_property
+    def instructions_text(self):
+        return self.tiny_font.render(
+            "Arrow keys/WASD: move, SPACE: shoot", True, GRAY)
+
+    @functools.cached_property
+    def score_rows(self):
+        return TextCache(self.small_font)  # filas de la tabla
+
+    @functools.cached_property
+    def asteroid_sprites(self):
+        return AsteroidSpriteCache()
+
+    @functools.cached_property
+    def asteroid_batch(self):
+        from batch import AsteroidBatch
+        return AsteroidBatch()
+
+    def reset_game(self, seed=None):
         """Resetear el juego a estado inicial"""
-        self.ship = Ship(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)
-        self.bullets = []
-        self.ufos = []
-        self.asteroids = []
-        self.spawn_asteroids(INITIAL_ASTEROIDS)
-
-        self.score = 0
-        self.lives = INITIAL_LIVES
-        self.invulnerable_time = 0
-        self.game_state = "playing"
+        super().reset_game(seed)
         self.name_input = ""
+        self.hud_dirty = True
 
-    def spawn_asteroids(self, count):
-        """Generar asteroides alejados de la nave"""
-        for _ in range(count):
-            while True:
-                x = random.randint(0, WINDOW_WIDTH)
-                y = random.randint(0, WINDOW_HEIGHT)
-                dist = math.sqrt((x - self.ship.x)**2 + (y - self.ship.y)**2)
-                if dist > 100:
-                    break
+    def invalidate_hud(self, event):
+        self.hud_dirty = True
+
+    def replay_path(self):
+        """Archivo de la repetición de la partida en curso: cada partida
+        lleva su semilla en el nombre (p. ej. partida.3141592.rpl)"""
+        root, ext = os.path.splitext(self.record_path)
+        return f"{root}.{self.seed}{ext}"
+
+    def save_replay(self, event=None):
+        """Guardar la repetición al terminar la partida (o al salir a
+        mitad de ella, ver run)"""
+        if self.recorder is None:
+            return
+        try:
+            self.recorder.replay(self.score).save(self.replay_path())
+        except (OSError, struct.error) as e:
+            print(f"Error al guardar la repetición: {e}")
 
-            asteroid = Asteroid(x, y, 0)  # Comenzar con asteroides grandes
-            self.asteroids.append(asteroid)
+    def step(self, inputs=0):
+        """Avanzar un paso recordando el estado anterior para interpolar"""
+        self.save_previous()
+        super().step(inputs)
 
     def handle_input(self):
-        """Manejar entrada del teclado"""
+        """Leer el teclado y devolver la máscara de entrada del frame"""
         keys = pygame.key.get_pressed()
 
-        if self.game_state == "playing":
-            if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-                self.ship.rotate_left()
-            if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-                self.ship.rotate_right()
-            if keys[pygame.K_UP] or keys[pygame.K_w]:
-                self.ship.accelerate()
+        inputs = self.pending_inputs
+        self.pending_inputs = 0
+        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+            inputs |= INPUT_LEFT
+        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+            inputs |= INPUT_RIGHT
+        if keys[pygame.K_UP] or keys[pygame.K_w]:
+            inputs |= INPUT_THRUST
+        return inputs
 
     def handle_events(self):
         """Manejar eventos de pygame"""
@@ -86,21 +199,36 @@ class Game:
                 if event.key == pygame.K_ESCAPE:
                     return False
 
+                elif event.key == pygame.K_F2:
+                    self.toggle_render_mode()
+
+                elif event.key == pygame.K_F3:
+                    self.show_profiler = not self.show_profiler
+                    if self.show_profiler:
+                        self.profiler.enabled = True
+                    if self.dirty is not None:
+                        self.dirty.invalidate()
+
                 elif self.game_state == "playing":
                     if event.key == pygame.K_SPACE:
-                        self.shoot()
+                        self.pending_inputs |= INPUT_SHOOT
 
                 elif self.game_state == "game_over":
                     if event.key == pygame.K_r:
                         self.reset_game()
                     elif event.key == pygame.K_h:
+                        self.scores_offset = 0
+                        self.scores_filter = None
                         self.game_state = "show_scores"
 
                 elif self.game_state == "enter_name":
                     if event.key == pygame.K_RETURN:
                         if self.name_input.strip():
-                            self.high_scores.add_score(
-                                self.name_input.strip(), self.score)
+                            self.player_name = self.name_input.strip()
+                            self.player_rank = self.high_scores.add_score(
+                                self.player_name, self.score)
+                        self.scores_filter = None
+                        self.show_player_rank()
                         self.game_state = "show_scores"
                     elif event.key == pygame.K_BACKSPACE:
                         self.name_input = self.name_input[:-1]
@@ -111,190 +239,155 @@ class Game:
                 elif self.game_state == "show_scores":
                     if event.key == pygame.K_r:
                         self.reset_game()
+                    elif event.key == pygame.K_UP:
+                        self.scroll_scores(-1)
+                    elif event.key == pygame.K_DOWN:
+                        self.scroll_scores(1)
+                    elif event.key == pygame.K_PAGEUP:
+                        self.scroll_scores(-SCORES_PAGE_SIZE)
+                    elif event.key == pygame.K_PAGEDOWN:
+                        self.scroll_scores(SCORES_PAGE_SIZE)
+                    elif event.key == pygame.K_HOME:
+                        self.scores_offset = 0
+                    elif event.key == pygame.K_m:
+                        self.scores_filter = None
+                        self.show_player_rank()
+                    elif event.key == pygame.K_n and self.player_name:
+                        # Alternar entre toda la tabla y las del jugador
+                        if self.scores_filter is None:
+                            self.scores_filter = self.player_name
+                        else:
+                            self.scores_filter = None
+                        self.scores_offset = 0
                     elif event.key == pygame.K_ESCAPE:
                         self.game_state = "game_over"
 
         return True
 
-    def shoot(self):
-        """Disparar bala del jugador"""
-        player_bullets = [b for b in self.bullets if not b.is_ufo_bullet]
-        if len(player_bullets) < MAX_BULLETS:
-            tip_x, tip_y = self.ship.get_tip()
-            bullet = Bullet(tip_x, tip_y, self.ship.angle)
-            self.bullets.append(bullet)
-
-    def check_collisions(self):
-        """Verificar todas las colisiones del juego"""
-        # Colisiones bala del jugador - asteroide
-        for bullet in self.bullets[:]:
-            if bullet.is_ufo_bullet:
-                continue
-
-            for asteroid in self.asteroids[:]:
-                dist = math.sqrt((bullet.x - asteroid.x) **
-                                 2 + (bullet.y - asteroid.y)**2)
-                if dist < asteroid.get_collision_radius():
-                    if bullet in self.bullets:
-                        self.bullets.remove(bullet)
-                    if asteroid in self.asteroids:
-                        self.asteroids.remove(asteroid)
-
-                    # Dividir el asteroide
-                    new_asteroids = asteroid.split()
-                    self.asteroids.extend(new_asteroids)
-
-                    # Aumentar puntaje
-                    self.score += ASTEROID_POINTS[asteroid.size_index]
-                    break
-
-        # Colisiones bala del jugador - UFO
-        for bullet in self.bullets[:]:
-            if bullet.is_ufo_bullet:
-                continue
-
-            for ufo in self.ufos[:]:
-                ufo_rect = ufo.get_collision_rect()
-                bullet_rect = pygame.Rect(bullet.x-2, bullet.y-2, 4, 4)
-                if ufo_rect.colliderect(bullet_rect):
-                    if bullet in self.bullets:
-                        self.bullets.remove(bullet)
-                    if ufo in self.ufos:
-                        self.ufos.remove(ufo)
-                    self.score += UFO_POINTS
-                    break
-
-        if self.invulnerable_time <= 0:
-            # Colisiones nave - asteroide
-            for asteroid in self.asteroids:
-                dist = math.sqrt((self.ship.x - asteroid.x) **
-                                 2 + (self.ship.y - asteroid.y)**2)
-                if dist < asteroid.get_collision_radius() + self.ship.size:
-                    self.hit_ship()
-                    break
-
-            # Colisiones nave - UFO
-            for ufo in self.ufos:
-                ufo_rect = ufo.get_collision_rect()
-                ship_rect = pygame.Rect(self.ship.x-self.ship.size, self.ship.y-self.ship.size,
-                                        self.ship.size*2, self.ship.size*2)
-                if ufo_rect.colliderect(ship_rect):
-                    self.hit_ship()
-                    break
-
-            # Colisiones nave - bala UFO
-            for bullet in self.bullets[:]:
-                if not bullet.is_ufo_bullet:
-                    continue
-
-                dist = math.sqrt((bullet.x - self.ship.x) **
-                                 2 + (bullet.y - self.ship.y)**2)
-                if dist < self.ship.size + 3:
-                    if bullet in self.bullets:
-                        self.bullets.remove(bullet)
-                    self.hit_ship()
-                    break
-
-    def hit_ship(self):
-        """Manejar cuando la nave es golpeada"""
-        self.lives -= 1
-        self.invulnerable_time = INVULNERABILITY_TIME
-        self.ship.reset_position()
-
-        if self.lives <= 0:
-            if self.high_scores.is_high_score(self.score):
-                self.game_state = "enter_name"
-            else:
-                self.game_state = "game_over"
+    def scroll_scores(self, rows):
+        """Desplazar la tabla de puntuaciones sin pasarse de los extremos"""
+        total = self.high_scores.count(name=self.scores_filter)
+        last = max(0, total - SCORES_PAGE_SIZE)
+        self.scores_offset = max(0, min(self.scores_offset + rows, last))
 
-    def update(self):
-        """Actualizar lógica del juego"""
-        if self.game_state != "playing":
+    def show_player_rank(self):
+        """Centrar la tabla en la última puntuación guardada"""
+        if self.player_rank is None:
+            self.scores_offset = 0
             return
-
-        self.ship.update()
-
-        # Actualizar balas
-        self.bullets = [bullet for bullet in self.bullets if bullet.update()]
-
-        # Actualizar asteroides
-        for asteroid in self.asteroids:
-            asteroid.update()
-
-        # Actualizar UFOs
-        for ufo in self.ufos[:]:
-            new_bullet = ufo.update(self.ship)
-            if new_bullet:
-                self.bullets.append(new_bullet)
-
-            if ufo.is_off_screen():
-                self.ufos.remove(ufo)
-
-        # Spawn de UFOs ocasionalmente
-        if random.random() < UFO_SPAWN_CHANCE and len(self.ufos) == 0:
-            self.ufos.append(UFO())
-
-        # Reducir tiempo de invulnerabilidad
-        if self.invulnerable_time > 0:
-            self.invulnerable_time -= 1
-
-        self.check_collisions()
-
-        # Verificar si se ganó el nivel
-        if not self.asteroids:
-            next_level_asteroids = INITIAL_ASTEROIDS + \
-                min(self.score // 2000, 4)
-            self.spawn_asteroids(next_level_asteroids)
-
-    def draw_game(self):
-        """Dibujar elementos del juego"""
-        # Dibujar estrellas de fondo
+        rows = self.high_scores.around_rank(self.player_rank,
+                                            SCORES_PAGE_SIZE)
+        self.scores_offset = rows[0][0] - 1 if rows else 0
+
+    def toggle_render_mode(self):
+        """Pasar a la siguiente ruta: vectorial, sprites cacheados o por
+        lotes (ésta sólo si numpy está instalado)"""
+        index = RENDER_MODES.index(self.render_mode) + 1
+        mode = RENDER_MODES[index % len(RENDER_MODES)]
+        if mode == "batch":
+            import batch
+            if batch.np is None:
+                mode = "vector"
+            else:
+                # Crearlo aquí: con numba, la primera vez compila la pasada
+                # (luego la carga del caché) y el tirón queda en la tecla,
+                # no a mitad del dibujo
+                self.asteroid_batch
+        self.render_mode = mode
+        self.show_render_stats = True
+        if self.dirty is not None:
+            self.dirty.invalidate()
+
+    def render_background(self, surface):
+        """Dibujar las estrellas de fondo una sola vez"""
         for x, y, brightness in self.stars:
             color = (brightness, brightness, brightness)
-            pygame.draw.circle(self.screen, color, (x, y), 1)
+            pygame.draw.circle(surface, color, (x, y), 1)
+
+    def draw_game(self, alpha=1.0):
+        """Dibujar elementos del juego, interpolados entre los dos últimos
+        pasos de simulación según `alpha`"""
+        screen = self.screen
+        background = self.background.get()
+        rects = self.frame_rects
+        rects.clear()
+
+        # Fondo de estrellas pre-renderizado; en modo de rectángulos sucios
+        # sólo se restaura bajo lo que se dibujó en el frame anterior
+        if self.dirty is None or self.dirty.full_redraw:
+            screen.blit(background, (0, 0))
+        else:
+            self.dirty.erase(screen, background)
 
         # Dibujar nave (parpadeando si es invulnerable)
         if self.invulnerable_time <= 0 or self.invulnerable_time % 10 < 5:
-            self.ship.draw(self.screen)
+            rects.append(self.ship.draw(screen, alpha))
 
         # Dibujar balas
         for bullet in self.bullets:
-            bullet.draw(self.screen)
+            rects.append(bullet.draw(screen, alpha))
 
         # Dibujar asteroides
-        for asteroid in self.asteroids:
-            asteroid.draw(self.screen)
+        if self.render_mode == "sprites":
+            sprites = self.asteroid_sprites
+            for asteroid in self.asteroids:
+                rects.append(sprites.draw(screen, asteroid, alpha))
+        elif self.render_mode == "batch":
+            rects.extend(self.asteroid_batch.draw(screen, self.asteroids,
+                                                  alpha))
+        else:
+            for asteroid in self.asteroids:
+                rects.append(asteroid.draw(screen, alpha))
 
         # Dibujar UFOs
         for ufo in self.ufos:
-            ufo.draw(self.screen)
+            rects.append(ufo.draw(screen, alpha))
 
         # UI del juego
-        score_text = self.font.render(f"Score: {self.score}", True, WHITE)
-        lives_text = self.font.render(f"Lives: {self.lives}", True, WHITE)
-
-        self.screen.blit(score_text, (10, 10))
-        self.screen.blit(lives_text, (10, 50))
+        if self.hud_dirty:
+            self.hud = (self.score_text.get(self.score),
+                        self.lives_text.get(self.lives))
+            self.hud_dirty = False
+        score_surface, lives_surface = self.hud
+        rects.append(screen.blit(score_surface, (10, 10)))
+        rects.append(screen.blit(lives_surface, (10, 50)))
 
         # Instrucciones
-        instructions = self.tiny_font.render(
-            "Arrow keys/WASD: move, SPACE: shoot", True, GRAY)
-        self.screen.blit(instructions, (10, WINDOW_HEIGHT - 20))
+        rects.append(screen.blit(self.instructions_text,
+                                 (10, WINDOW_HEIGHT - 20)))
+
+        # Tiempo de frame de ambas rutas de dibujo
+        if self.show_render_stats:
+            stats = "  |  ".join(
+                f"{'> ' if mode == self.render_mode else ''}{mode}: {ms:.2f} ms"
+                for mode, ms in self.draw_times.items())
+            stats_text = self.tiny_font.render(stats, True, GRAY)
+            rects.append(screen.blit(stats_text, stats_text.get_rect(
+                topright=(WINDOW_WIDTH - 10, 10))))
 
     def draw_game_over(self):
         """Dibujar pantalla de game over"""
+        key = (self.score, self.final_rank, tuple(self.stats.counts))
+        self.screen.blit(self.game_over_layer.get(key), (0, 0))
+
+    def render_game_over(self, surface):
+        """Renderizar la pantalla de game over en su capa"""
         game_over_text = self.font.render("GAME OVER!", True, RED)
         score_text = self.small_font.render(
             f"Final Score: {self.score}", True, WHITE)
 
-        # Verificar si es puntuación alta
-        if self.high_scores.is_high_score(self.score):
-            rank = self.high_scores.get_rank(self.score)
+        # Puesto calculado una sola vez al terminar la partida
+        if self.final_rank is not None:
             rank_text = self.small_font.render(
-                f"New High Score! Rank #{rank}", True, YELLOW)
+                f"New High Score! Rank #{self.final_rank}", True, YELLOW)
         else:
             rank_text = None
 
+        stats = self.stats.as_dict()
+        stats_text = self.tiny_font.render(
+            f"Level {self.level}  |  Asteroids: {stats['asteroid_destroyed']}"
+            f"  |  UFOs: {stats['ufo_killed']}", True, GRAY)
+
         restart_text = self.small_font.render(
             "R: Restart  |  H: High Scores  |  ESC: Quit", True, WHITE)
 
@@ -306,17 +399,23 @@ class Game:
         restart_rect = restart_text.get_rect(
             center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 + 40))
 
-        self.screen.blit(game_over_text, game_over_rect)
-        self.screen.blit(score_text, score_rect)
-        self.screen.blit(restart_text, restart_rect)
+        surface.blit(game_over_text, game_over_rect)
+        surface.blit(score_text, score_rect)
+        surface.blit(restart_text, restart_rect)
+        surface.blit(stats_text, stats_text.get_rect(
+            center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 + 70)))
 
         if rank_text:
             rank_rect = rank_text.get_rect(
                 center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 + 15))
-            self.screen.blit(rank_text, rank_rect)
+            surface.blit(rank_text, rank_rect)
 
     def draw_name_input(self):
         """Dibujar pantalla de entrada de nombre"""
+        self.screen.blit(self.name_input_layer.get(self.name_input), (0, 0))
+
+    def render_name_input(self, surface):
+        """Renderizar la pantalla de entrada de nombre en su capa"""
         title_text = self.font.render("NEW HIGH SCORE!", True, YELLOW)
         prompt_text = self.small_font.render("Enter your name:", True, WHITE)
         name_text = self.font.render(self.name_input + "_", True, GREEN)
@@ -332,54 +431,89 @@ class Game:
         instruction_rect = instruction_text.get_rect(
             center=(WINDOW_WIDTH//2, WINDOW_HEIGHT//2 + 50))
 
-        self.screen.blit(title_text, title_rect)
-        self.screen.blit(prompt_text, prompt_rect)
-        self.screen.blit(name_text, name_rect)
-        self.screen.blit(instruction_text, instruction_rect)
+        surface.blit(title_text, title_rect)
+        surface.blit(prompt_text, prompt_rect)
+        surface.blit(name_text, name_rect)
+        surface.blit(instruction_text, instruction_rect)
 
     def draw_high_scores(self):
         """Dibujar tabla de puntuaciones altas"""
-        title_text = self.font.render("HIGH SCORES", True, YELLOW)
+        key = (self.high_scores.revision, self.scores_offset,
+               self.scores_filter, self.player_rank)
+        self.screen.blit(self.high_scores_layer.get(key), (0, 0))
+
+    def render_high_scores(self, surface):
+        """Renderizar la página visible de la tabla en su capa.
+
+        Sólo se consultan las filas visibles y cada línea se renderiza una
+        vez, así el costo no depende del tamaño de la tabla.
+        """
+        title = "HIGH SCORES"
+        if self.scores_filter is not None:
+            title += f" - {self.scores_filter}"
+        title_text = self.font.render(title, True, YELLOW)
         title_rect = title_text.get_rect(center=(WINDOW_WIDTH//2, 100))
-        self.screen.blit(title_text, title_rect)
+        surface.blit(title_text, title_rect)
 
-        scores = self.high_scores.get_scores()
+        scores = self.high_scores.query(self.scores_offset, SCORES_PAGE_SIZE,
+                                        name=self.scores_filter)
 
         if not scores:
             no_scores_text = self.small_font.render(
                 "No high scores yet!", True, WHITE)
             no_scores_rect = no_scores_text.get_rect(
                 center=(WINDOW_WIDTH//2, 200))
-            self.screen.blit(no_scores_text, no_scores_rect)
+            surface.blit(no_scores_text, no_scores_rect)
         else:
             y_start = 150
-            for i, score_data in enumerate(scores[:10]):
-                rank = f"{i+1:2d}."
+            for i, (position, score_data) in enumerate(scores):
+                rank = f"{position:2d}."
                 name = score_data["name"][:10]
                 score = f"{score_data['score']:,}"
                 date = score_data["date"][:10]  # Solo la fecha
 
                 # Formatear la línea
                 line = f"{rank} {name:<10} {score:>8} {date}"
-                color = YELLOW if i == 0 else WHITE
-
-                score_line = self.small_font.render(line, True, color)
-                self.screen.blit(score_line, (WINDOW_WIDTH //
+                if position == self.player_rank:
+                    color = GREEN
+                elif position == 1:
+                    color = YELLOW
+                else:
+                    color = WHITE
+
+                score_line = self.score_rows.get(line, color)
+                surface.blit(score_line, (WINDOW_WIDTH //
                                  2 - 150, y_start + i * 25))
 
+            total = self.high_scores.count(name=self.scores_filter)
+            range_text = self.tiny_font.render(
+                f"{self.scores_offset + 1}-{self.scores_offset + len(scores)}"
+                f" of {total}  |  UP/DOWN, PGUP/PGDN: scroll  |  "
+                f"M: my rank  |  N: my scores", True, GRAY)
+            range_rect = range_text.get_rect(
+                center=(WINDOW_WIDTH//2, y_start + SCORES_PAGE_SIZE * 25 + 15))
+            surface.blit(range_text, range_rect)
+
         # Instrucciones
         back_text = self.small_font.render(
             "R: Restart  |  ESC: Back  |  ESC ESC: Quit", True, GRAY)
         back_rect = back_text.get_rect(
             center=(WINDOW_WIDTH//2, WINDOW_HEIGHT - 50))
-        self.screen.blit(back_text, back_rect)
+        surface.blit(back_text, back_rect)
 
-    def draw(self):
+    def draw(self, alpha=1.0):
         """Dibujar todo según el estado actual"""
-        self.screen.fill(BLACK)
+        start = time.perf_counter()
+
+        # Cada estado blitea primero una capa opaca de pantalla completa,
+        # así no hace falta limpiar la pantalla
+        if self.game_state != self.drawn_state:
+            self.drawn_state = self.game_state
+            if self.dirty is not None:
+                self.dirty.invalidate()
 
         if self.game_state == "playing":
-            self.draw_game()
+            self.draw_game(alpha)
         elif self.game_state == "game_over":
             self.draw_game_over()
         elif self.game_state == "enter_name":
@@ -387,18 +521,131 @@ class Game:
         elif self.game_state == "show_scores":
             self.draw_high_scores()
 
-        pygame.display.flip()
+        if self.show_profiler:
+            overlay = self.draw_profiler_overlay()
+            if self.game_state == "playing":
+                self.frame_rects.append(overlay)
+
+        profiler = self.profiler
+        if profiler.enabled:
+            profiler.mark("draw")
+
+        if self.dirty is not None and self.game_state == "playing":
+            self.dirty.present(self.frame_rects)
+        else:
+            pygame.display.flip()
+
+        if profiler.enabled:
+            profiler.mark("flip")
+
+        # Promedio móvil del tiempo de frame de la ruta actual
+        elapsed = (time.perf_counter() - start) * 1000
+        mode = self.render_mode
+        self.draw_times[mode] = self.draw_times[mode] * 0.95 + elapsed * 0.05
+
+    def draw_profiler_overlay(self):
+        """Dibujar la gráfica de tiempos de frame y los percentiles"""
+        profiler = self.profiler
+        width, height = 280, 210
+        rect = pygame.Rect(WINDOW_WIDTH - width - 10,
+                           WINDOW_HEIGHT - height - 10, width, height)
+        self.screen.fill(BLACK, rect)
+        pygame.draw.rect(self.screen, GRAY, rect, 1)
+
+        # Barras de los últimos frames; la línea marca 16.6 ms (60 FPS)
+        graph_height = 60
+        base_y = rect.top + graph_height + 5
+        scale = graph_height / 33.3
+        totals = profiler.history()[-(width - 10):]
+        for i, total in enumerate(totals):
+            bar = min(graph_height, total * 1000 * scale)
+            color = GREEN if total < 1 / 60 else RED
+            x = rect.left + 5 + i
+            pygame.draw.line(self.screen, color, (x, base_y), (x, base_y - bar))
+        budget_y = base_y - 16.6 * scale
+        pygame.draw.line(self.screen, YELLOW, (rect.left + 5, budget_y),
+                         (rect.right - 5, budget_y))
+
+        # Los percentiles se recalculan cada 30 frames
+        if profiler.frames % 30 == 0 or not self.profiler_lines:
+            summary = profiler.summary()
+            rows = [("ms", "p50", "p95", "p99")]
+            for name in ("total",) + PHASES:
+                rows.append((name,) + tuple(f"{v:.2f}" for v in summary[name]))
+            counters = profiler.counters
+            last = (profiler.index - 1) % profiler.size
+            rows.append((f"ast {counters['asteroids'][last]}",
+                         f"bul {counters['bullets'][last]}",
+                         f"ufo {counters['ufos'][last]}",
+                         f"gc {counters['gc'][last]}"))
+            self.profiler_lines = [
+                [self.tiny_font.render(cell, True, WHITE) for cell in row]
+                for row in rows]
+
+        # Tabla bajo la gráfica, en columnas fijas
+        y = base_y + 6
+        for row in self.profiler_lines:
+            for column, cell in enumerate(row):
+                self.screen.blit(cell, (rect.left + 8 + column * 66, y))
+            y += 15
+        return rect
 
     def run(self):
-        """Loop principal del juego"""
-        running = True
+        """Loop principal del juego.
 
-        while running:
-            running = self.handle_events()
-            self.handle_input()
-            self.update()
-            self.draw()
-            self.clock.tick(60)
+        La simulación avanza en pasos fijos de 1/SIMULATION_RATE s, sin
+        importar a qué ritmo se dibuja, y cada frame se dibuja interpolando
+        entre los dos últimos pasos. Si el dibujo se atrasa se dan hasta
+        `max_frame_skip` pasos por frame y el tiempo restante se descarta.
+        """
+        running = True
+        step_time = 1.0 / SIMULATION_RATE
+        accumulator = 0.0
+        previous = time.perf_counter()
+
+        try:
+            while running:
+                now = time.perf_counter()
+                accumulator += now - previous
+                previous = now
+
+                profiler = self.profiler
+                if profiler.enabled:
+                    profiler.begin_frame()
+                running = self.handle_events()
+                if profiler.enabled:
+                    profiler.mark("events")
+
+                steps = 0
+                while accumulator >= step_time and \
+                        steps < self.max_frame_skip:
+                    inputs = self.handle_input()
+                    if profiler.enabled:
+                        profiler.mark("input")
+                    self.step(inputs)
+                    accumulator -= step_time
+                    steps += 1
+                if accumulator >= step_time:
+                    accumulator %= step_time  # seguir en tiempo real
+
+                self.draw(accumulator / step_time)
+                if profiler.enabled:
+                    profiler.end_frame(self)
+
+                if self.startup is not None:
+                    self.startup.mark("primer frame")
+                    self.startup.report()
+                    self.startup = None
+                if self.exit_after_first_frame:
+                    running = False
+                self.clock.tick(self.fps)
+        finally:
+            if self.profile_path:
+                self.profiler.dump(self.profile_path)
+            # Una partida sin terminar (salida o error) también se guarda:
+            # es la que hace falta para reproducir un fallo
+            if self.game_state == "playing":
+                self.save_replay()
 
         pygame.quit()
         sys.exit()
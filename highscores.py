@@ -1,71 +1,643 @@
 """
 Sistema de puntuaciones altas para Asteroids
+
+Las puntuaciones se guardan en un registro de solo-anexado (una línea JSON
+por puntuación) con un índice ordenado en memoria, así agregar una
+puntuación no reescribe el archivo y el ranking se consulta en O(log n).
+El registro se compacta periódicamente de forma segura (archivo temporal +
+rename). También hay un backend SQLite con índice por puntuación y el
+formato JSON original, que sólo guarda las mejores.
+
+Las escrituras se hacen en un hilo aparte y la carga es perezosa, así el
+bucle del juego nunca espera al disco.
 """
 
+import bisect
+import contextlib
+import functools
+import itertools
 import json
+import math
 import os
+import threading
 from datetime import datetime
 
+COMPACT_EVERY = 1000  # anexos entre compactaciones del registro
 
-class HighScores:
-    def __init__(self, filename="highscores.json", max_scores=10):
+
+class ScoreIndex:
+    """Puntuaciones ordenadas de mayor a menor con búsquedas por bisect.
+
+    Los empates se ordenan por orden de llegada, como el sort estable del
+    formato original. Un segundo índice por nombre permite listar las
+    puntuaciones de un jugador sin recorrer toda la tabla.
+    """
+
+    def __init__(self):
+        self.entries = []
+        self.keys = []  # (-score, secuencia), ascendente
+        self.names = {}  # NOMBRE -> [(clave, entrada)], ascendente
+        self.sequence = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, entry):
+        """Agregar una entrada y devolver su posición (desde 1)"""
+        key = (-entry["score"], self.sequence)
+        self.sequence += 1
+        position = bisect.bisect_right(self.keys, key)
+        self.keys.insert(position, key)
+        self.entries.insert(position, entry)
+        # Las claves son únicas: la tupla nunca llega a comparar entradas
+        bisect.insort(self.names.setdefault(entry["name"].upper(), []),
+                      (key, entry))
+        return position + 1
+
+    def top(self, count):
+        return self.entries[:count]
+
+    def count_at_least(self, score):
+        """Cantidad de puntuaciones mayores o iguales a `score`"""
+        return bisect.bisect_right(self.keys, (-score, math.inf))
+
+    def query(self, offset, limit, name=None, since=None, until=None):
+        """Página de (posición, entrada) que cumplen los filtros"""
+        if name is None and since is None and until is None:
+            return list(enumerate(self.entries[offset:offset + limit],
+                                  offset + 1))
+        return list(itertools.islice(self._matches(name, since, until),
+                                     offset, offset + limit))
+
+    def count(self, name=None, since=None, until=None):
+        if since is None and until is None:
+            if name is None:
+                return len(self.entries)
+            return len(self.names.get(name.upper(), ()))
+        return sum(1 for _ in self._matches(name, since, until))
+
+    def _matches(self, name, since, until):
+        if name is not None:
+            keys = self.keys
+            rows = ((bisect.bisect_left(keys, key) + 1, entry)
+                    for key, entry in self.names.get(name.upper(), ()))
+        else:
+            rows = enumerate(self.entries, 1)
+
+        for rank, entry in rows:
+            if since is not None and entry["date"] < since:
+                continue
+            if until is not None and entry["date"] >= until:
+                continue
+            yield rank, entry
+
+    def truncate(self, count):
+        """Quedarse con las `count` mejores"""
+        if len(self.entries) > count:
+            del self.entries[count:]
+            del self.keys[count:]
+            self.names = {}
+            for key, entry in zip(self.keys, self.entries):
+                self.names.setdefault(entry["name"].upper(), []).append(
+                    (key, entry))
+
+    def clear(self):
+        self.entries = []
+        self.keys = []
+        self.names = {}
+
+
+class ScoreWriter:
+    """Hilo que escribe las puntuaciones en segundo plano.
+
+    Las escrituras pendientes se combinan: los anexos consecutivos a un
+    archivo se escriben juntos con un solo fsync y un reemplazo completo
+    descarta lo pendiente para ese archivo.
+    """
+
+    def __init__(self):
+        self.pending = []  # [tipo, archivo, datos]
+        self.condition = threading.Condition()
+        self.busy = False
+        self.closed = False
+        self.thread = None
+
+    def append(self, filename, text):
+        """Anexar texto al archivo"""
+        with self.condition:
+            last = self.pending[-1] if self.pending else None
+            if last and last[0] == "append" and last[1] == filename:
+                last[2] += text
+            else:
+                self._submit(["append", filename, text])
+
+    def replace(self, filename, render):
+        """Reemplazar el archivo con `render()`, calculado en el hilo"""
+        with self.condition:
+            self.pending = [job for job in self.pending if job[1] != filename]
+            self._submit(["replace", filename, render])
+
+    def call(self, function):
+        """Ejecutar `function()` en el hilo, en orden con lo demás"""
+        with self.condition:
+            self._submit(["call", None, function])
+
+    def _submit(self, job):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True,
+                                           name="highscores-writer")
+            self.thread.start()
+        self.pending.append(job)
+        self.condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                jobs = self.pending
+                self.pending = []
+                self.busy = True
+
+            for kind, filename, data in jobs:
+                try:
+                    if kind == "append":
+                        with open(filename, 'a') as f:
+                            f.write(data)
+                            f.flush()
+                            os.fsync(f.fileno())
+                    elif kind == "replace":
+                        _atomic_write(filename, data())
+                    else:
+                        data()
+                except Exception as e:
+                    print(f"Error al guardar puntuaciones: {e}")
+
+            with self.condition:
+                self.busy = False
+                self.condition.notify_all()
+
+    def flush(self):
+        """Esperar a que se escriba todo lo pendiente"""
+        with self.condition:
+            while self.thread is not None and (self.pending or self.busy):
+                self.condition.wait()
+
+    def close(self):
+        """Escribir lo pendiente y terminar el hilo"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None  # escrituras posteriores abren otro hilo
+
+
+class JsonStore(ScoreIndex):
+    """Formato original: sólo las mejores, reescritas completas en JSON"""
+
+    def __init__(self, filename, max_scores, writer):
+        super().__init__()
         self.filename = filename
         self.max_scores = max_scores
-        self.scores = self.load_scores()
+        self.writer = writer
+        for entry in _load_json(filename):
+            self.add(entry)
 
-    def load_scores(self):
-        """Cargar puntuaciones desde archivo"""
-        if os.path.exists(self.filename):
+    def add(self, entry):
+        rank = super().add(entry)
+        self.truncate(self.max_scores)
+        self.save()
+        return rank if rank <= self.max_scores else None
+
+    def clear(self):
+        super().clear()
+        self.save()
+
+    def save(self):
+        self.writer.replace(self.filename, functools.partial(
+            json.dumps, list(self.entries), indent=2))
+
+
+class LogStore(ScoreIndex):
+    """Registro de solo-anexado con índice ordenado en memoria"""
+
+    def __init__(self, filename, writer, legacy_filename=None,
+                 compact_every=COMPACT_EVERY):
+        super().__init__()
+        self.filename = filename
+        self.writer = writer
+        self.compact_every = compact_every
+        self.appended = 0
+
+        if os.path.exists(filename):
+            if self._load():
+                # Hubo líneas incompletas (p. ej. un corte de luz): reescribir
+                self.compact()
+        elif legacy_filename and os.path.exists(legacy_filename):
+            # Migrar las puntuaciones del formato JSON original
+            for entry in _load_json(legacy_filename):
+                super().add(entry)
+            self.compact()
+
+    def _load(self):
+        """Leer el registro; devuelve True si encontró líneas dañadas"""
+        damaged = False
+        with open(self.filename, 'r') as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    damaged = True
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    damaged = True
+                    continue
+                if record.get("op") == "clear":
+                    super().clear()
+                else:
+                    super().add(record)
+        return damaged
+
+    def add(self, entry):
+        rank = super().add(entry)
+        self.writer.append(self.filename, json.dumps(entry) + "\n")
+
+        self.appended += 1
+        if self.appended >= self.compact_every:
+            self.compact()
+        return rank
+
+    def clear(self):
+        super().clear()
+        self.compact()
+
+    def compact(self):
+        """Reescribir el registro ordenado, de forma atómica"""
+        self.writer.replace(self.filename, functools.partial(
+            _render_log, list(self.entries)))
+        self.appended = 0
+
+
+class SqliteStore:
+    """Puntuaciones en SQLite con índice por puntuación.
+
+    Las inserciones se confirman en el hilo de escritura, con su propia
+    conexión; las lecturas no esperan por ellas: combinan lo que ya está en
+    la base con las puntuaciones pendientes que aún no son visibles.
+    """
+
+    def __init__(self, filename, writer, legacy_filename=None):
+        import sqlite3  # sólo este backend lo necesita
+
+        self.filename = filename
+        self.writer = writer
+        self.pending = []  # (id, entrada) agregadas pero aún no confirmadas
+        self.lock = threading.Lock()
+        new = not os.path.exists(filename)
+        self.db = sqlite3.connect(filename, check_same_thread=False,
+                                  isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=FULL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            "id INTEGER PRIMARY KEY, name TEXT, score INTEGER, date TEXT)")
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS scores_by_score "
+            "ON scores (score DESC, id)")
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS scores_by_name "
+            "ON scores (name COLLATE NOCASE, score DESC, id)")
+
+        if new and legacy_filename and os.path.exists(legacy_filename):
+            self.db.execute("BEGIN")
+            self.db.executemany(
+                "INSERT INTO scores (name, score, date) "
+                "VALUES (:name, :score, :date)",
+                _load_json(legacy_filename))
+            self.db.execute("COMMIT")
+
+        # Los ids se asignan al agregar, así una lectura sabe qué pendientes
+        # ya están confirmados: los de id hasta el máximo que ve en la base
+        self.next_id = self.db.execute(
+            "SELECT COALESCE(MAX(id), 0) + 1 FROM scores").fetchone()[0]
+        self.write_db = None  # conexión del hilo de escritura
+
+    @contextlib.contextmanager
+    def _reading(self):
+        """Transacción de lectura; produce las entradas pendientes que aún
+        no están en la instantánea de la base"""
+        with self.lock:
+            pending = list(self.pending)
+            self.db.execute("BEGIN")
             try:
-                with open(self.filename, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                pass
-        return []
+                last_id = self.db.execute(
+                    "SELECT COALESCE(MAX(id), 0) FROM scores").fetchone()[0]
+                yield [entry for entry_id, entry in pending
+                       if entry_id > last_id]
+            finally:
+                self.db.execute("COMMIT")
 
-    def save_scores(self):
-        """Guardar puntuaciones en archivo"""
-        try:
-            with open(self.filename, 'w') as f:
-                json.dump(self.scores, f, indent=2)
-        except Exception as e:
-            print(f"Error al guardar puntuaciones: {e}")
+    def __len__(self):
+        with self._reading() as pending:
+            return self.db.execute(
+                "SELECT COUNT(*) FROM scores").fetchone()[0] + len(pending)
+
+    def add(self, entry):
+        with self.lock:
+            entry_id = self.next_id
+            self.next_id += 1
+            self.pending.append((entry_id, entry))
+        self.writer.call(functools.partial(self._insert, entry_id, entry))
+        return self.count_at_least(entry["score"])
+
+    def _insert(self, entry_id, entry):
+        if self.write_db is None:
+            import sqlite3
+            self.write_db = sqlite3.connect(self.filename,
+                                            check_same_thread=False)
+            self.write_db.execute("PRAGMA synchronous=FULL")
+        with self.write_db:
+            self.write_db.execute(
+                "INSERT INTO scores (id, name, score, date) "
+                "VALUES (:id, :name, :score, :date)",
+                dict(entry, id=entry_id))
+        with self.lock:
+            self.pending.remove((entry_id, entry))
+
+    def top(self, count):
+        with self._reading() as pending:
+            rows = self.db.execute(
+                "SELECT name, score, date FROM scores "
+                "ORDER BY score DESC, id LIMIT ?", (count,))
+            entries = [{"name": name, "score": score, "date": date}
+                       for name, score, date in rows]
+        if pending:
+            entries.extend(pending)
+            entries.sort(key=lambda entry: -entry["score"])
+            del entries[count:]
+        return entries
+
+    def count_at_least(self, score):
+        with self._reading() as pending:
+            return self.db.execute(
+                "SELECT COUNT(*) FROM scores WHERE score >= ?",
+                (score,)).fetchone()[0] + \
+                sum(1 for entry in pending if entry["score"] >= score)
+
+    def query(self, offset, limit, name=None, since=None, until=None):
+        where, params = self._where(name, since, until)
+        with self._reading() as pending:
+            if not pending:
+                return self._query_db(where, params, offset, limit)
+
+            # Las pendientes van detrás de las confirmadas con la misma
+            # puntuación (sus ids son mayores): las posiciones de la base se
+            # corren por cada pendiente con más puntos
+            rows = [(rank + sum(1 for entry in pending
+                                if entry["score"] > row["score"]), row)
+                    for rank, row in self._query_db(where, params, 0,
+                                                    offset + limit)]
+            for i, entry in enumerate(pending):
+                if not _entry_matches(entry, name, since, until):
+                    continue
+                rank = self.db.execute(
+                    "SELECT COUNT(*) FROM scores WHERE score >= ?",
+                    (entry["score"],)).fetchone()[0] + \
+                    sum(1 for j, other in enumerate(pending)
+                        if other["score"] > entry["score"] or
+                        (other["score"] == entry["score"] and j < i)) + 1
+                rows.append((rank, entry))
+        rows.sort(key=lambda row: row[0])
+        return rows[offset:offset + limit]
+
+    def _query_db(self, where, params, offset, limit):
+        if not where:
+            rows = self.db.execute(
+                "SELECT name, score, date FROM scores "
+                "ORDER BY score DESC, id LIMIT ? OFFSET ?",
+                (limit, offset))
+            return [(rank, {"name": name, "score": score, "date": date})
+                    for rank, (name, score, date)
+                    in enumerate(rows, offset + 1)]
+
+        rows = self.db.execute(
+            "SELECT rank, name, score, date FROM ("
+            "SELECT ROW_NUMBER() OVER (ORDER BY score DESC, id) AS rank, "
+            "name, score, date FROM scores) "
+            f"WHERE {where} ORDER BY rank LIMIT ? OFFSET ?",
+            params + [limit, offset])
+        return [(rank, {"name": name, "score": score, "date": date})
+                for rank, name, score, date in rows]
+
+    def count(self, name=None, since=None, until=None):
+        where, params = self._where(name, since, until)
+        with self._reading() as pending:
+            return self.db.execute(
+                "SELECT COUNT(*) FROM scores" +
+                (f" WHERE {where}" if where else ""),
+                params).fetchone()[0] + \
+                sum(1 for entry in pending
+                    if _entry_matches(entry, name, since, until))
+
+    def _where(self, name, since, until):
+        clauses = []
+        params = []
+        if name is not None:
+            clauses.append("name = ? COLLATE NOCASE")
+            params.append(name)
+        if since is not None:
+            clauses.append("date >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("date < ?")
+            params.append(until)
+        return " AND ".join(clauses), params
+
+    def clear(self):
+        # Poco frecuente: se hace en el momento, tras lo pendiente
+        self.writer.flush()
+        with self.lock:
+            self.db.execute("DELETE FROM scores")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+            if self.write_db is not None:
+                self.write_db.close()
+                self.write_db = None
+
+
+class HighScores:
+    def __init__(self, filename="highscores.json", max_scores=10,
+                 backend="log"):
+        self.filename = filename
+        self.max_scores = max_scores
+        self.backend = backend
+        self.revision = 0  # cambia con cada modificación de la tabla
+        self.writer = ScoreWriter()
+
+        # La tabla se carga en el primer uso (o en segundo plano con preload)
+        self._store = None
+        self._load_lock = threading.Lock()
+
+    @property
+    def store(self):
+        if self._store is None:
+            with self._load_lock:
+                if self._store is None:
+                    self._store = self.open_store()
+        return self._store
+
+    def preload(self):
+        """Empezar a cargar la tabla en segundo plano"""
+        threading.Thread(target=lambda: self.store, daemon=True,
+                         name="highscores-loader").start()
+
+    def open_store(self):
+        """Abrir el backend; los nuevos importan el JSON original"""
+        base = os.path.splitext(self.filename)[0]
+        if self.backend == "json":
+            return JsonStore(self.filename, self.max_scores, self.writer)
+        if self.backend == "log":
+            return LogStore(base + ".jsonl", self.writer, self.filename)
+        if self.backend == "sqlite":
+            return SqliteStore(base + ".db", self.writer, self.filename)
+        raise ValueError(f"Backend de puntuaciones desconocido: {self.backend}")
+
+    @property
+    def scores(self):
+        """Mejores puntuaciones (las que se muestran en la tabla)"""
+        return self.store.top(self.max_scores)
 
     def add_score(self, name, score):
-        """Agregar nueva puntuación"""
+        """Agregar nueva puntuación y devolver su posición en la tabla.
+
+        Con el backend JSON devuelve None si no entró entre las mejores.
+        """
         new_score = {
             "name": name[:10],  # Limitar nombre a 10 caracteres
             "score": score,
             "date": datetime.now().strftime("%Y-%m-%d %H:%M")
         }
 
-        self.scores.append(new_score)
-        # Ordenar por puntuación (mayor a menor)
-        self.scores.sort(key=lambda x: x["score"], reverse=True)
-        # Mantener solo las mejores puntuaciones
-        self.scores = self.scores[:self.max_scores]
-        self.save_scores()
+        rank = self.store.add(new_score)
+        self.revision += 1
+        return rank
 
     def is_high_score(self, score):
         """Verificar si la puntuación califica como alta"""
-        if len(self.scores) < self.max_scores:
+        if len(self.store) < self.max_scores:
             return True
-        return score > self.scores[-1]["score"]
+        return score > self.store.top(self.max_scores)[-1]["score"]
 
     def get_rank(self, score):
         """Obtener el ranking de una puntuación"""
-        rank = 1
-        for high_score in self.scores:
-            if score > high_score["score"]:
-                break
-            rank += 1
-        return rank
+        return self.store.count_at_least(score) + 1
 
     def get_scores(self):
         """Obtener lista de puntuaciones"""
-        return self.scores.copy()
+        return list(self.scores)
+
+    def query(self, offset=0, limit=None, name=None, since=None, until=None):
+        """Página de la tabla como lista de (posición, entrada).
+
+        `name` filtra por jugador (sin distinguir mayúsculas) y
+        `since`/`until` por fecha, como texto "AAAA-MM-DD[ HH:MM]" o
+        datetime; `since` incluye el límite y `until` no. Las posiciones son
+        las de la tabla completa.
+        """
+        if limit is None:
+            limit = self.max_scores
+        return self.store.query(max(0, offset), limit, name,
+                                _date_text(since), _date_text(until))
+
+    def count(self, name=None, since=None, until=None):
+        """Cantidad de puntuaciones guardadas que cumplen los filtros"""
+        return self.store.count(name, _date_text(since), _date_text(until))
+
+    def around_rank(self, rank, limit=None):
+        """Página de `limit` puntuaciones centrada en la posición `rank`"""
+        if limit is None:
+            limit = self.max_scores
+        offset = min(rank - 1 - limit // 2, self.count() - limit)
+        return self.query(max(0, offset), limit)
 
     def clear_scores(self):
         """Limpiar todas las puntuaciones"""
-        self.scores = []
-        self.save_scores()
+        self.store.clear()
+        self.revision += 1
+
+    def load_scores(self):
+        """Volver a leer la tabla desde disco y devolver las mejores.
+
+        Se mantiene por compatibilidad con la API anterior.
+        """
+        with self._load_lock:
+            self.writer.flush()
+            if isinstance(self._store, SqliteStore):
+                self._store.close()
+            self._store = None
+        self.revision += 1
+        return self.get_scores()
+
+    def save_scores(self):
+        """Guardar las puntuaciones pendientes (compatibilidad: cada
+        add_score ya se escribe en segundo plano)"""
+        self.flush()
+
+    def flush(self):
+        """Esperar a que las puntuaciones estén en disco"""
+        self.writer.flush()
+
+    def close(self):
+        """Guardar lo pendiente y liberar el backend"""
+        with self._load_lock:
+            self.writer.close()
+            if isinstance(self._store, SqliteStore):
+                self._store.close()
+            self._store = None
+
+
+def _load_json(filename):
+    """Cargar puntuaciones del formato JSON original"""
+    if os.path.exists(filename):
+        try:
+            with open(filename, 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            pass
+    return []
+
+
+def _date_text(value):
+    """Fechas como texto comparable con el de las entradas"""
+    if value is None or isinstance(value, str):
+        return value
+    return value.strftime("%Y-%m-%d %H:%M")
+
+
+def _entry_matches(entry, name, since, until):
+    """Mismos filtros que las consultas: nombre sin distinguir mayúsculas,
+    `since` incluido y `until` no"""
+    if name is not None and entry["name"].upper() != name.upper():
+        return False
+    if since is not None and entry["date"] < since:
+        return False
+    return until is None or entry["date"] < until
+
+
+def _render_log(entries):
+    return "".join(json.dumps(entry) + "\n" for entry in entries)
+
+
+def _atomic_write(filename, data):
+    """Escribir a un temporal, sincronizar y renombrar encima del original"""
+    temp = filename + ".tmp"
+    with open(temp, 'w') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp, filename)
@@ -0,0 +1,77 @@
+"""
+Capas de dibujo cacheadas para Asteroids: fondo, textos del HUD y pantallas
+estáticas que sólo se vuelven a renderizar cuando cambian sus datos
+"""
+
+import pygame
+from collections import OrderedDict
+from constants import *
+
+_MISSING = object()
+
+
+class CachedLayer:
+    """Superficie de pantalla completa que se re-renderiza al cambiar su clave.
+
+    `render(surface)` dibuja la capa desde cero; la superficie resultante es
+    opaca y reemplaza al fill(BLACK) del frame.
+    """
+
+    def __init__(self, render, size=(WINDOW_WIDTH, WINDOW_HEIGHT)):
+        self.render = render
+        self.size = size
+        self.key = _MISSING
+        self.surface = None
+
+    def get(self, key=None):
+        if self.surface is None or key != self.key:
+            if self.surface is None:
+                self.surface = pygame.Surface(self.size)
+                if pygame.display.get_surface() is not None:
+                    self.surface = self.surface.convert()
+            self.surface.fill(BLACK)
+            self.render(self.surface)
+            self.key = key
+        return self.surface
+
+    def invalidate(self):
+        self.key = _MISSING
+
+
+class CachedText:
+    """Texto del HUD que sólo se vuelve a renderizar si cambia su valor"""
+
+    def __init__(self, font, template, color):
+        self.font = font
+        self.template = template
+        self.color = color
+        self.value = _MISSING
+        self.surface = None
+
+    def get(self, value):
+        if value != self.value:
+            self.surface = self.font.render(
+                self.template.format(value), True, self.color)
+            self.value = value
+        return self.surface
+
+
+class TextCache:
+    """Textos de una misma fuente, conservando los `size` usados más recientes"""
+
+    def __init__(self, font, size=64):
+        self.font = font
+        self.size = size
+        self.surfaces = OrderedDict()
+
+    def get(self, text, color):
+        key = (text, color)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.font.render(text, True, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.size:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
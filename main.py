@@ -4,21 +4,125 @@ Asteroids Game - Archivo Principal
 Recreación del clásico juego Asteroids
 """
 
-import pygame
+import argparse
 import sys
-from game import Game
+import time
+
+from constants import RENDER_FPS, MAX_FRAME_SKIP
+
+
+def parse_args(argv=None):
+    """Opciones de línea de comandos"""
+    parser = argparse.ArgumentParser(description="Asteroids")
+    parser.add_argument("--headless", action="store_true",
+                        help="simular sin ventana tan rápido como sea posible")
+    parser.add_argument("--frames", type=int, default=100000,
+                        help="frames a simular en modo headless")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="semilla de la partida (y del controlador headless)")
+    parser.add_argument("--array-store", action="store_true",
+                        help="usar el almacén de entidades en arrays NumPy")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="actualizar sólo las zonas de pantalla que cambian")
+    parser.add_argument("--record", metavar="ARCHIVO",
+                        help="grabar la repetición de cada partida, en "
+                             "ARCHIVO con la semilla antes de la extensión")
+    parser.add_argument("--replay", metavar="ARCHIVO",
+                        help="reproducir y verificar una repetición sin ventana")
+    parser.add_argument("--profile", action="store_true",
+                        help="medir los tiempos de cada fase del frame (F3)")
+    parser.add_argument("--profile-out", metavar="ARCHIVO",
+                        help="guardar los tiempos al salir (.csv o .jsonl)")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="mostrar el tiempo de cada fase del arranque")
+    parser.add_argument("--fps", type=int, default=RENDER_FPS,
+                        help="límite de frames dibujados por segundo "
+                             "(0 = sin límite); la simulación sigue a 60 pasos/s")
+    parser.add_argument("--max-frame-skip", type=int, default=MAX_FRAME_SKIP,
+                        help="pasos de simulación máximos por frame dibujado")
+    parser.add_argument("--exit-after-first-frame", action="store_true",
+                        help="salir al presentar el primer frame (medir arranque)")
+    return parser.parse_args(argv)
+
+
+def run_headless(args):
+    """Simular sin pantalla y mostrar el rendimiento"""
+    from simulation import Simulation, random_controller
+
+    sim = Simulation(array_store=args.array_store, seed=args.seed)
+    start = time.perf_counter()
+    frames = sim.run(args.frames, random_controller(args.seed))
+    elapsed = time.perf_counter() - start
+
+    print(f"{frames} frames en {elapsed:.2f} s "
+          f"({frames / elapsed:,.0f} frames/s)")
+
+
+def run_replay(args):
+    """Reproducir una repetición y verificar su puntuación"""
+    from replay import Replay, verify_replay
+
+    replay = Replay.load(args.replay)
+    start = time.perf_counter()
+    ok, sim = verify_replay(replay)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(replay.inputs)} frames reproducidos en {elapsed:.2f} s")
+    print(f"Puntuación registrada: {replay.score}, obtenida: {sim.score}")
+    print("Repetición verificada" if ok else "La repetición NO coincide")
+    return ok
 
 
 def main():
     """Función principal del juego"""
-    pygame.init()
+    args = parse_args()
+
+    if args.replay:
+        sys.exit(0 if run_replay(args) else 1)
+
+    if args.headless:
+        run_headless(args)
+        return
+
+    startup = None
+    if args.startup_profile:
+        from startup import StartupTimer
+        startup = StartupTimer()
+
+    import pygame
+    if startup is not None:
+        startup.mark("import pygame")
+
+    # Sólo los módulos que usa el juego: pygame.init() también abriría el
+    # audio y los joysticks, que pueden tardar en algunos equipos
+    pygame.display.init()
+    pygame.font.init()
+    if startup is not None:
+        startup.mark("init display/font")
+
+    from game import Game
+    if startup is not None:
+        startup.mark("import game")
 
+    game = None
     try:
-        game = Game()
+        game = Game(array_store=args.array_store,
+                    dirty_rects=args.dirty_rects,
+                    seed=args.seed, record_path=args.record,
+                    profile=args.profile, profile_path=args.profile_out,
+                    startup=startup,
+                    exit_after_first_frame=args.exit_after_first_frame,
+                    fps=args.fps,
+                    max_frame_skip=max(1, args.max_frame_skip))
+        if startup is not None:
+            startup.mark("Game()")
         game.run()
     except Exception as e:
         print(f"Error al ejecutar el juego: {e}")
     finally:
+        # Asegurar que las puntuaciones pendientes lleguen al disco
+        if game is not None:
+            game.high_scores.close()
         pygame.quit()
         sys.exit()
 
@@ -0,0 +1,87 @@
+"""
+Pruebas exactas de colisión para Asteroids: polígonos contra puntos,
+segmentos y triángulos
+
+Se usan sólo después de descartar con el círculo envolvente (ver
+broadphase.py). Los polígonos son cascos relativos a su centro, como los
+que devuelven Asteroid.get_hull y Ship.get_hull; las posiciones se comparan
+con wraparound.
+"""
+
+from constants import WINDOW_WIDTH, WINDOW_HEIGHT
+from broadphase import wrap_delta
+
+
+def point_in_polygon(x, y, polygon):
+    """Punto dentro de un polígono simple (par-impar), cóncavo o no"""
+    inside = False
+    x1, y1 = polygon[-1]
+    for x2, y2 in polygon:
+        if (y1 > y) != (y2 > y) and \
+                x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+
+def segments_cross(ax, ay, bx, by, cx, cy, dx, dy):
+    """Los segmentos AB y CD se cortan (los toques colineales no cuentan)"""
+    abx = bx - ax
+    aby = by - ay
+    cdx = dx - cx
+    cdy = dy - cy
+    d1 = abx * (cy - ay) - aby * (cx - ax)
+    d2 = abx * (dy - ay) - aby * (dx - ax)
+    if (d1 > 0) == (d2 > 0) or d1 == 0 or d2 == 0:
+        return False
+    d3 = cdx * (ay - cy) - cdy * (ax - cx)
+    d4 = cdx * (by - cy) - cdy * (bx - cx)
+    return (d3 > 0) != (d4 > 0) and d3 != 0 and d4 != 0
+
+
+def segment_polygon_hit(x0, y0, x1, y1, polygon):
+    """El segmento termina dentro del polígono o cruza alguno de sus lados"""
+    if point_in_polygon(x1, y1, polygon):
+        return True
+    px, py = polygon[-1]
+    for qx, qy in polygon:
+        if segments_cross(x0, y0, x1, y1, px, py, qx, qy):
+            return True
+        px, py = qx, qy
+    return False
+
+
+def polygons_overlap(a, b):
+    """Dos polígonos simples en el mismo sistema de coordenadas se tocan:
+    algún par de lados se corta o uno contiene al otro"""
+    px, py = a[-1]
+    for qx, qy in a:
+        rx, ry = b[-1]
+        for sx, sy in b:
+            if segments_cross(px, py, qx, qy, rx, ry, sx, sy):
+                return True
+            rx, ry = sx, sy
+        px, py = qx, qy
+    return point_in_polygon(a[0][0], a[0][1], b) or \
+        point_in_polygon(b[0][0], b[0][1], a)
+
+
+def segment_hull_hit(x, y, step_x, step_y, cx, cy, hull):
+    """Barrido exacto contra un casco centrado en (cx, cy).
+
+    Mismas convenciones que segment_circle_hit: el segmento termina en
+    (x, y) y recorrió (step_x, step_y), relativo al casco.
+    """
+    end_x = wrap_delta(x - cx, WINDOW_WIDTH)
+    end_y = wrap_delta(y - cy, WINDOW_HEIGHT)
+    return segment_polygon_hit(end_x - step_x, end_y - step_y,
+                               end_x, end_y, hull)
+
+
+def hull_triangle_hit(cx, cy, hull, x, y, triangle):
+    """Casco centrado en (cx, cy) contra un triángulo centrado en (x, y),
+    por ejemplo el de la nave"""
+    offset_x = wrap_delta(x - cx, WINDOW_WIDTH)
+    offset_y = wrap_delta(y - cy, WINDOW_HEIGHT)
+    placed = [(offset_x + px, offset_y + py) for px, py in triangle]
+    return polygons_overlap(hull, placed)
@@ -0,0 +1,230 @@
+"""
+Codificador de observaciones para agentes de Asteroids (estilo Gym)
+
+ObservationEncoder escribe en cada paso un vector float32 de tamaño fijo
+dentro de un buffer preasignado: pose y velocidad de la nave, los K
+asteroides más cercanos con distancia sobre el toro, el UFO y sus balas, y
+vidas/puntuación. Las posiciones se expresan relativas a la nave y
+normalizadas a la mitad de la pantalla.
+
+RasterObserver lee una observación de píxeles reducida directamente de la
+superficie de pygame mediante vistas de pygame.surfarray.
+"""
+
+import math
+
+from constants import *
+from broadphase import wrap_delta, wrapped_distance_sq
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SHIP_FEATURES = 7  # x, y, vel_x, vel_y, cos, sin, invulnerable
+ASTEROID_FEATURES = 6  # dx, dy, vel_x, vel_y, tamaño, presente
+THREAT_FEATURES = 5  # dx, dy, vel_x, vel_y, presente
+STATUS_FEATURES = 2  # vidas, puntuación
+
+HALF_WIDTH = WINDOW_WIDTH / 2
+HALF_HEIGHT = WINDOW_HEIGHT / 2
+SCORE_SCALE = 10000
+
+
+class ObservationEncoder:
+    def __init__(self, k_nearest=8, ufo_bullets=4):
+        if np is None:
+            raise RuntimeError("Las observaciones necesitan numpy")
+        self.k_nearest = k_nearest
+        self.ufo_bullets = ufo_bullets
+        self.asteroid_offset = SHIP_FEATURES
+        self.ufo_offset = self.asteroid_offset + k_nearest * ASTEROID_FEATURES
+        self.bullet_offset = self.ufo_offset + THREAT_FEATURES
+        self.status_offset = self.bullet_offset + ufo_bullets * THREAT_FEATURES
+        self.size = self.status_offset + STATUS_FEATURES
+        self.shape = (self.size,)
+        self.buffer = np.zeros(self.shape, dtype=np.float32)
+
+        # Arrays de trabajo, crecen sólo cuando hay más asteroides
+        self._capacity = 0
+        self._grow(64)
+        self._nearest = np.zeros(k_nearest, dtype=np.intp)
+        self._picked = np.empty(k_nearest)
+        self._picked_vel = np.empty((k_nearest, 2))
+        self._bullets = [None] * ufo_bullets
+        self._bullet_dist = [0.0] * ufo_bullets
+
+    def _grow(self, capacity):
+        self._capacity = capacity
+        self._dx = np.empty(capacity)
+        self._dy = np.empty(capacity)
+        self._dist = np.empty(capacity)
+        self._tmp = np.empty(capacity)
+        self._vel = np.empty((capacity, 2))
+        self._sizes = np.empty(capacity)
+
+    def encode(self, sim, out=None):
+        """Escribir la observación de `sim` en `out` (o en self.buffer)"""
+        if out is None:
+            out = self.buffer
+        out.fill(0)
+
+        ship = self.ship_features(sim, out)
+        self.asteroid_features(sim, ship, out)
+        self.threat_features(sim, ship, out)
+
+        status = self.status_offset
+        out[status] = sim.lives / INITIAL_LIVES
+        out[status + 1] = sim.score / SCORE_SCALE
+        return out
+
+    def ship_features(self, sim, out):
+        ship = sim.ship
+        angle = math.radians(ship.angle)
+        out[0] = ship.x / WINDOW_WIDTH
+        out[1] = ship.y / WINDOW_HEIGHT
+        out[2] = ship.vel_x / SHIP_MAX_SPEED
+        out[3] = ship.vel_y / SHIP_MAX_SPEED
+        out[4] = math.cos(angle)
+        out[5] = math.sin(angle)
+        out[6] = sim.invulnerable_time > 0
+        return ship
+
+    def asteroid_features(self, sim, ship, out):
+        asteroids = sim.asteroids
+        count = len(asteroids)
+        if count == 0:
+            return
+        if count > self._capacity:
+            self._grow(max(count, self._capacity * 2))
+
+        dx = self._dx[:count]
+        dy = self._dy[:count]
+        vel = self._vel[:count]
+        sizes = self._sizes[:count]
+        for i, asteroid in enumerate(asteroids):
+            dx[i] = asteroid.x
+            dy[i] = asteroid.y
+            vel[i, 0] = asteroid.vel_x
+            vel[i, 1] = asteroid.vel_y
+            sizes[i] = asteroid.size_index
+
+        # Diferencia más corta sobre el toro, en el rango [-mitad, mitad)
+        _wrap(dx, ship.x, WINDOW_WIDTH)
+        _wrap(dy, ship.y, WINDOW_HEIGHT)
+        dist = self._dist[:count]
+        tmp = self._tmp[:count]
+        np.multiply(dx, dx, out=dist)
+        np.multiply(dy, dy, out=tmp)
+        dist += tmp
+
+        # K es pequeño: K pasadas de argmin, marcando cada elegido, dan los
+        # más cercanos ya ordenados sin los temporales de argpartition
+        k = min(self.k_nearest, count)
+        nearest = self._nearest[:k]
+        for i in range(k):
+            j = dist.argmin()
+            nearest[i] = j
+            dist[j] = np.inf
+
+        block = out[self.asteroid_offset:self.ufo_offset].reshape(
+            self.k_nearest, ASTEROID_FEATURES)
+        picked = self._picked[:k]
+        picked_vel = self._picked_vel[:k]
+        np.take(dx, nearest, out=picked, mode='clip')
+        np.divide(picked, HALF_WIDTH, out=block[:k, 0])
+        np.take(dy, nearest, out=picked, mode='clip')
+        np.divide(picked, HALF_HEIGHT, out=block[:k, 1])
+        np.take(vel, nearest, axis=0, out=picked_vel, mode='clip')
+        np.divide(picked_vel, ASTEROID_SPEEDS[-1], out=block[:k, 2:4])
+        np.take(sizes, nearest, out=picked, mode='clip')
+        np.divide(picked, len(ASTEROID_SIZES) - 1, out=block[:k, 4])
+        block[:k, 5] = 1
+
+    def threat_features(self, sim, ship, out):
+        # UFO más cercano, con la misma distancia sobre el toro con la que
+        # se escribe su posición relativa
+        best = None
+        best_dist = 0
+        for ufo in sim.ufos:
+            dist = wrapped_distance_sq(ufo.x, ufo.y, ship.x, ship.y)
+            if best is None or dist < best_dist:
+                best, best_dist = ufo, dist
+        if best is not None:
+            self._write_threat(out, self.ufo_offset, ship, best)
+
+        # Balas de UFO más cercanas, por inserción en listas preasignadas
+        nearest = self._bullets
+        nearest_dist = self._bullet_dist
+        limit = self.ufo_bullets
+        found = 0
+        for bullet in sim.bullets:
+            if not bullet.is_ufo_bullet:
+                continue
+            dist = wrapped_distance_sq(bullet.x, bullet.y, ship.x, ship.y)
+            i = found
+            while i > 0 and nearest_dist[i - 1] > dist:
+                if i < limit:
+                    nearest[i] = nearest[i - 1]
+                    nearest_dist[i] = nearest_dist[i - 1]
+                i -= 1
+            if i < limit:
+                nearest[i] = bullet
+                nearest_dist[i] = dist
+            if found < limit:
+                found += 1
+
+        for i in range(found):
+            self._write_threat(out, self.bullet_offset + i * THREAT_FEATURES,
+                               ship, nearest[i])
+            nearest[i] = None  # no retener balas ya eliminadas
+
+    def _write_threat(self, out, offset, ship, entity):
+        out[offset] = wrap_delta(entity.x - ship.x, WINDOW_WIDTH) / HALF_WIDTH
+        out[offset + 1] = wrap_delta(
+            entity.y - ship.y, WINDOW_HEIGHT) / HALF_HEIGHT
+        out[offset + 2] = entity.vel_x / BULLET_SPEED
+        out[offset + 3] = entity.vel_y / BULLET_SPEED
+        out[offset + 4] = 1
+
+
+class RasterObserver:
+    """Observación de píxeles reducida leída de la superficie de pygame.
+
+    `pygame.surfarray.pixels_red` devuelve una vista sobre los píxeles de la
+    superficie; el submuestreo con pasos es otra vista, así la única copia
+    es la escritura final en el buffer preasignado. Todo se dibuja en
+    blanco o gris, por lo que el canal rojo basta como escala de grises.
+    """
+
+    def __init__(self, surface, scale=4):
+        if np is None:
+            raise RuntimeError("La observación de píxeles necesita numpy")
+        self.surface = surface
+        self.scale = scale
+        width, height = surface.get_size()
+        self.buffer = np.zeros(((height + scale - 1) // scale,
+                                (width + scale - 1) // scale), dtype=np.uint8)
+        self.shape = self.buffer.shape
+
+    def observe(self, out=None):
+        import pygame
+
+        if out is None:
+            out = self.buffer
+        pixels = pygame.surfarray.pixels_red(self.surface)
+        try:
+            # surfarray usa (x, y); la observación es (fila, columna)
+            np.copyto(out, pixels[::self.scale, ::self.scale].T)
+        finally:
+            # Liberar la vista desbloquea la superficie para seguir dibujando
+            del pixels
+        return out
+
+
+def _wrap(values, origin, span):
+    """values = diferencia más corta sobre el toro desde `origin`, en sitio"""
+    values -= origin
+    values += span / 2
+    np.remainder(values, span, out=values)
+    values -= span / 2
@@ -0,0 +1,56 @@
+"""
+Pools de objetos para Asteroids
+
+Las balas y los asteroides se crean y destruyen constantemente; en lugar de
+dejarlos al recolector de basura se guardan al liberarse y se reinician con
+`reset()` al volver a pedirlos. Así las cascadas de divisiones no generan
+basura ni pausas del GC.
+"""
+
+
+class ObjectPool:
+    """Pool de objetos con método reset(*args) equivalente a __init__.
+
+    `on_release(obj)` se llama al devolver un objeto, por ejemplo para
+    liberar su ranura en el almacén de arrays.
+    """
+
+    def __init__(self, factory, on_release=None):
+        self.factory = factory
+        self.on_release = on_release
+        self.free = []
+        self.hits = 0
+        self.misses = 0
+        self.in_use = 0
+        self.high_water = 0
+
+    def acquire(self, *args, **kwargs):
+        """Obtener un objeto reiniciado con los argumentos dados"""
+        if self.free:
+            obj = self.free.pop()
+            obj.reset(*args, **kwargs)
+            self.hits += 1
+        else:
+            obj = self.factory(*args, **kwargs)
+            self.misses += 1
+
+        self.in_use += 1
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+        return obj
+
+    def release(self, obj):
+        """Devolver un objeto al pool"""
+        if self.on_release is not None:
+            self.on_release(obj)
+        self.in_use -= 1
+        self.free.append(obj)
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "in_use": self.in_use,
+            "high_water": self.high_water,
+            "free": len(self.free),
+        }
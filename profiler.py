@@ -0,0 +1,133 @@
+"""
+Perfilador de frames para Asteroids
+
+Registra el tiempo de cada fase del frame (eventos, entrada, actualización,
+colisiones, dibujo y flip) en un buffer circular, junto con el número de
+entidades y de recolecciones del GC. Desactivado sólo cuesta comprobar un
+booleano por frame.
+"""
+
+import gc
+import json
+import time
+from array import array
+from constants import *
+
+PHASES = ("events", "input", "update", "collisions", "draw", "flip")
+COUNTERS = ("asteroids", "bullets", "ufos", "gc")
+
+
+class FrameProfiler:
+    def __init__(self, size=PROFILER_HISTORY):
+        self.enabled = False
+        self.size = size
+        self.index = 0  # posición del frame actual en el buffer
+        self.count = 0  # frames válidos en el buffer
+        self.frames = 0  # frames registrados en total
+        self.phases = {name: array("d", [0.0]) * size for name in PHASES}
+        self.totals = array("d", [0.0]) * size
+        self.counters = {name: array("l", [0]) * size for name in COUNTERS}
+        self._frame_start = 0.0
+        self._last = 0.0
+        self._gc_collections = 0
+        # Si se activa a mitad de frame (F3), mark y end_frame no hacen
+        # nada hasta el próximo begin_frame
+        self._in_frame = False
+
+    def reset(self):
+        """Vaciar el historial, p. ej. antes de una medición nueva"""
+        self.index = 0
+        self.count = 0
+        self.frames = 0
+        self._in_frame = False
+
+    def begin_frame(self):
+        index = self.index
+        for samples in self.phases.values():
+            samples[index] = 0.0
+        self._gc_collections = _gc_collections()
+        self._frame_start = self._last = time.perf_counter()
+        self._in_frame = True
+
+    def mark(self, phase):
+        """Cerrar la fase `phase` en el instante actual"""
+        if not self._in_frame:
+            return
+        now = time.perf_counter()
+        self.phases[phase][self.index] += now - self._last
+        self._last = now
+
+    def end_frame(self, sim):
+        if not self._in_frame:
+            return
+        self._in_frame = False
+        index = self.index
+        self.totals[index] = time.perf_counter() - self._frame_start
+        counters = self.counters
+        counters["asteroids"][index] = len(sim.asteroids)
+        counters["bullets"][index] = len(sim.bullets)
+        counters["ufos"][index] = len(sim.ufos)
+        counters["gc"][index] = _gc_collections() - self._gc_collections
+
+        self.index = (index + 1) % self.size
+        if self.count < self.size:
+            self.count += 1
+        self.frames += 1
+
+    def history(self, samples=None):
+        """Muestras válidas de más antigua a más reciente"""
+        if samples is None:
+            samples = self.totals
+        if self.count < self.size:
+            return samples[:self.count]
+        return samples[self.index:] + samples[:self.index]
+
+    def percentiles(self, phase=None, quantiles=(50, 95, 99)):
+        """Percentiles en milisegundos del total o de una fase"""
+        samples = self.totals if phase is None else self.phases[phase]
+        values = sorted(self.history(samples))
+        if not values:
+            return tuple(0.0 for _ in quantiles)
+        last = len(values) - 1
+        return tuple(values[min(last, int(round(q / 100 * last)))] * 1000
+                     for q in quantiles)
+
+    def summary(self):
+        """Percentiles p50/p95/p99 del total y de cada fase"""
+        summary = {"total": self.percentiles()}
+        for phase in PHASES:
+            summary[phase] = self.percentiles(phase)
+        return summary
+
+    def rows(self):
+        """Filas del buffer en orden cronológico, tiempos en ms"""
+        first = self.frames - self.count
+        start = self.index if self.count == self.size else 0
+        for offset in range(self.count):
+            i = (start + offset) % self.size
+            row = {"frame": first + offset,
+                   "total_ms": self.totals[i] * 1000}
+            for phase in PHASES:
+                row[phase + "_ms"] = self.phases[phase][i] * 1000
+            for name in COUNTERS:
+                row[name] = self.counters[name][i]
+            yield row
+
+    def dump(self, filename):
+        """Guardar el buffer en CSV o JSONL según la extensión"""
+        with open(filename, "w") as f:
+            if filename.endswith(".jsonl"):
+                for row in self.rows():
+                    f.write(json.dumps(row) + "\n")
+            else:
+                header = ["frame", "total_ms"] + \
+                    [p + "_ms" for p in PHASES] + list(COUNTERS)
+                f.write(",".join(header) + "\n")
+                for row in self.rows():
+                    f.write(",".join(
+                        f"{row[k]:.4f}" if isinstance(row[k], float)
+                        else str(row[k]) for k in header) + "\n")
+
+
+def _gc_collections():
+    return sum(stats["collections"] for stats in gc.get_stats())
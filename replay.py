@@ -0,0 +1,97 @@
+"""
+Grabación y reproducción de partidas de Asteroids
+
+Una repetición guarda la semilla de la partida y la máscara de entradas de
+cada frame (un byte, comprimido con zlib), así ocupa unos pocos KB. Al
+reproducirla en la simulación headless se obtiene exactamente la misma
+partida, lo que sirve para reproducir errores y verificar puntuaciones.
+"""
+
+import struct
+import zlib
+
+MAGIC = b"ARPL"
+# 2: balas con barrido; 3: nave-UFO sin pygame; 4: tablas trig;
+# 5: formas del catálogo; 6: colisiones exactas contra el casco;
+# 7: UFOs sin wraparound; 8: balas de la nave con la tabla trig;
+# 9: una bala que alcanza a varios asteroides destruye el primero
+VERSION = 9
+FLAG_ARRAY_STORE = 1
+
+# magic, versión, flags, semilla, frames, puntuación final
+_HEADER = struct.Struct("<4sHHQIi")
+
+
+class ReplayError(Exception):
+    pass
+
+
+class Replay:
+    def __init__(self, seed, inputs, score=0, array_store=False):
+        self.seed = seed
+        self.inputs = inputs
+        self.score = score
+        self.array_store = array_store
+
+    def to_bytes(self):
+        flags = FLAG_ARRAY_STORE if self.array_store else 0
+        header = _HEADER.pack(MAGIC, VERSION, flags, self.seed,
+                              len(self.inputs), self.score)
+        return header + zlib.compress(bytes(self.inputs), 9)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < _HEADER.size:
+            raise ReplayError("Archivo de repetición incompleto")
+        magic, version, flags, seed, frames, score = \
+            _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ReplayError("Formato de repetición no soportado")
+        inputs = zlib.decompress(data[_HEADER.size:])
+        if len(inputs) != frames:
+            raise ReplayError("Repetición corrupta")
+        return cls(seed, inputs, score, bool(flags & FLAG_ARRAY_STORE))
+
+    def save(self, filename):
+        with open(filename, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+class ReplayRecorder:
+    """Registra la semilla y las entradas de la partida en curso"""
+
+    def __init__(self, array_store=False):
+        self.array_store = array_store
+        self.seed = 0
+        self.inputs = bytearray()
+
+    def start(self, seed):
+        self.seed = seed
+        self.inputs.clear()
+
+    def record(self, inputs):
+        self.inputs.append(inputs)
+
+    def replay(self, score):
+        return Replay(self.seed, bytes(self.inputs), score, self.array_store)
+
+
+def play_replay(replay):
+    """Reproducir una repetición sin pantalla, tan rápido como sea posible"""
+    from simulation import Simulation
+
+    sim = Simulation(array_store=replay.array_store, seed=replay.seed)
+    for inputs in replay.inputs:
+        sim.step(inputs)
+    return sim
+
+
+def verify_replay(replay):
+    """Comprobar que la repetición produce la puntuación registrada"""
+    sim = play_replay(replay)
+    return sim.score == replay.score, sim
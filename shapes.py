@@ -0,0 +1,52 @@
+"""
+Catálogo de formas de asteroides para Asteroids
+
+En lugar de generar un polígono al azar para cada asteroide (y para cada
+fragmento) se generan al arrancar ASTEROID_SHAPE_TEMPLATES plantillas por
+tamaño, con un generador propio y semilla fija. Cada asteroide sólo guarda
+el índice de su plantilla; los vértices, el radio envolvente y las cachés
+de sprites y de vértices se comparten entre todos los que la usan.
+"""
+
+import math
+import random
+from constants import *
+
+
+class ShapeTemplate:
+    """Polígono local de un asteroide y su radio envolvente"""
+
+    __slots__ = ("points", "radius")
+
+    def __init__(self, points):
+        self.points = tuple(points)
+        self.radius = max(math.hypot(x, y) for x, y in self.points)
+
+
+class ShapeCatalogue:
+    """Plantillas de forma por tamaño, reproducibles a partir de `seed`"""
+
+    def __init__(self, seed=ASTEROID_SHAPE_SEED,
+                 count=ASTEROID_SHAPE_TEMPLATES, sizes=ASTEROID_SIZES):
+        self.seed = seed
+        rng = random.Random(seed)
+        self.templates = [[self._generate(size, rng) for _ in range(count)]
+                          for size in sizes]
+
+    def get(self, size_index, template):
+        return self.templates[size_index][template]
+
+    @staticmethod
+    def _generate(size, rng):
+        """Polígono irregular de 6 a 10 vértices alrededor del centro"""
+        num_points = rng.randint(6, 10)
+        points = []
+        for i in range(num_points):
+            angle = (2 * math.pi * i) / num_points
+            radius = size * rng.uniform(0.8, 1.2)
+            points.append((radius * math.cos(angle), radius * math.sin(angle)))
+        return ShapeTemplate(points)
+
+
+# Catálogo compartido por todos los asteroides
+CATALOGUE = ShapeCatalogue()
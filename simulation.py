@@ -0,0 +1,478 @@
+"""
+Núcleo de simulación de Asteroids, sin ventana, fuentes ni reloj
+
+No depende de pygame: Game (escritorio) y main_mobile.py (Kivy) dibujan
+sobre esta misma clase. Sin pantalla la simulación puede avanzar tan rápido
+como permita la CPU, útil para entrenar agentes, verificar partidas y
+pruebas de carga.
+"""
+
+import math
+import random
+from constants import *
+from entities import Ship, Bullet, Asteroid, UFO
+from broadphase import (SpatialGrid, wrapped_distance_sq,
+                        segment_circle_hit, segment_box_hit)
+from narrowphase import segment_hull_hit, hull_triangle_hit
+from pools import ObjectPool
+from events import (EventBus, GameStats, ASTEROID_DESTROYED, UFO_KILLED,
+                    SHIP_HIT, LEVEL_CLEARED, GAME_OVER)
+
+# Bits de entrada por frame
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_THRUST = 4
+INPUT_SHOOT = 8
+
+# Desplazamiento máximo por frame de los asteroides, para ampliar las
+# consultas de barrido a la rejilla
+ASTEROID_MAX_STEP = max(ASTEROID_SPEEDS) * math.sqrt(2)
+
+
+class Simulation:
+    def __init__(self, array_store=False, high_scores=None, seed=None,
+                 recorder=None, profiler=None):
+        # Sistema de puntuaciones (opcional sin interfaz)
+        self.high_scores = high_scores
+
+        # Grabador opcional de entradas (ver replay.py)
+        self.recorder = recorder
+
+        # Perfilador opcional de fases (ver profiler.py)
+        self.profiler = profiler
+
+        # Generador aleatorio propio de cada partida
+        self.rng = random.Random()
+
+        # Bus de eventos: la puntuación, el avance de nivel y el fin de la
+        # partida se suscriben primero, antes que HUD y estadísticas
+        self.events = EventBus()
+        self.events.subscribe(ASTEROID_DESTROYED, self.score_asteroid)
+        self.events.subscribe(UFO_KILLED, self.score_ufo)
+        self.events.subscribe(LEVEL_CLEARED, self.start_level)
+        self.events.subscribe(GAME_OVER, self.end_game)
+        self.stats = GameStats(self.events)
+
+        # Almacén opcional de entidades en arrays NumPy
+        if array_store:
+            from world import ArrayWorld
+            self.world = ArrayWorld()
+            self.asteroid_class = self.world.Asteroid
+            self.bullet_class = self.world.Bullet
+            release_asteroid = self.asteroid_class.release
+            release_bullet = self.bullet_class.release
+        else:
+            self.world = None
+            self.asteroid_class = Asteroid
+            self.bullet_class = Bullet
+            release_asteroid = release_bullet = None
+
+        # Pools de balas y asteroides: el bucle principal no genera basura
+        self.asteroid_pool = ObjectPool(self.asteroid_class, release_asteroid)
+        self.bullet_pool = ObjectPool(self.bullet_class, release_bullet)
+
+        # Rejilla de broadphase de asteroides, reutilizada en cada frame
+        self.asteroid_grid = SpatialGrid()
+
+        # Marcas de entidades destruidas, reutilizadas en cada frame
+        self.dead_bullets = set()
+        self.dead_asteroids = set()
+        self.dead_ufos = set()
+        self.fragments = []
+
+        self.bullets = []
+        self.ufos = []
+        self.asteroids = []
+        self.reset_game(seed)
+
+    def reset_game(self, seed=None):
+        """Resetear el juego a estado inicial.
+
+        Sin semilla se elige una nueva, así cada partida puede repetirse
+        exactamente a partir de `self.seed` y sus entradas. La semilla se
+        reduce a 32 bits sin signo, lo que cabe en la cabecera de las
+        repeticiones (una negativa no se podría guardar).
+        """
+        if seed is None:
+            seed = random.getrandbits(32)
+        seed &= 0xFFFFFFFF
+        self.seed = seed
+        self.rng.seed(seed)
+        self.frame = 0
+        if self.recorder is not None:
+            self.recorder.start(seed)
+
+        self.ship = Ship(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2)
+        for bullet in self.bullets:
+            self.bullet_pool.release(bullet)
+        for asteroid in self.asteroids:
+            self.asteroid_pool.release(asteroid)
+        self.bullets.clear()
+        self.ufos.clear()
+        self.asteroids.clear()
+        self.spawn_asteroids(INITIAL_ASTEROIDS)
+
+        self.score = 0
+        self.lives = INITIAL_LIVES
+        self.level = 1
+        self.final_rank = None  # puesto en la tabla, al terminar
+        self.invulnerable_time = 0
+        self.game_state = "playing"
+        self.stats.reset()
+
+    def spawn_asteroids(self, count):
+        """Generar asteroides alejados de la nave"""
+        for _ in range(count):
+            while True:
+                x = self.rng.randint(0, WINDOW_WIDTH)
+                y = self.rng.randint(0, WINDOW_HEIGHT)
+                dist = math.sqrt((x - self.ship.x)**2 + (y - self.ship.y)**2)
+                if dist > 100:
+                    break
+
+            asteroid = self.asteroid_pool.acquire(x, y, 0, self.rng)  # Comenzar con asteroides grandes
+            self.asteroids.append(asteroid)
+
+    def save_previous(self):
+        """Recordar el estado de cada entidad antes del próximo paso.
+
+        Los front-ends lo llaman antes de step() para dibujar interpolando
+        entre el paso anterior y el actual.
+        """
+        if self.game_state != "playing":
+            return
+        self.ship.save_previous()
+        for asteroid in self.asteroids:
+            asteroid.save_previous()
+        for bullet in self.bullets:
+            bullet.save_previous()
+        for ufo in self.ufos:
+            ufo.save_previous()
+
+    def apply_input(self, inputs):
+        """Aplicar una máscara de bits INPUT_* a la nave"""
+        if self.game_state != "playing":
+            return
+
+        if inputs & INPUT_SHOOT:
+            self.shoot()
+        if inputs & INPUT_LEFT:
+            self.ship.rotate_left()
+        if inputs & INPUT_RIGHT:
+            self.ship.rotate_right()
+        if inputs & INPUT_THRUST:
+            self.ship.accelerate()
+
+    def step(self, inputs=0):
+        """Avanzar un paso fijo de simulación con la entrada dada"""
+        if self.game_state != "playing":
+            return
+
+        if self.recorder is not None:
+            self.recorder.record(inputs)
+        self.apply_input(inputs)
+        self.update()
+        self.frame += 1
+
+    def run(self, frames, controller=None, reset_on_game_over=True):
+        """Avanzar `frames` pasos sin dibujar.
+
+        `controller(sim)` devuelve la máscara de entrada de cada paso; sin
+        controlador la nave no hace nada.
+        """
+        steps = 0
+        for _ in range(frames):
+            if self.game_state != "playing":
+                if not reset_on_game_over:
+                    break
+                self.reset_game()
+            self.step(controller(self) if controller else 0)
+            steps += 1
+        return steps
+
+    def shoot(self):
+        """Disparar bala del jugador"""
+        player_bullets = 0
+        for bullet in self.bullets:
+            if not bullet.is_ufo_bullet:
+                player_bullets += 1
+        if player_bullets < MAX_BULLETS:
+            tip_x, tip_y = self.ship.get_tip()
+            bullet = self.bullet_pool.acquire(tip_x, tip_y, self.ship.angle)
+            self.bullets.append(bullet)
+
+    def check_collisions(self):
+        """Verificar todas las colisiones del juego"""
+        # Reconstruir la rejilla con las posiciones de este frame; con el
+        # almacén de arrays las consultas se hacen directamente sobre él
+        if self.world is not None:
+            asteroid_grid = self.world.asteroids
+        else:
+            asteroid_grid = self.asteroid_grid
+            asteroid_grid.clear()
+            for asteroid in self.asteroids:
+                asteroid_grid.insert(asteroid, asteroid.x, asteroid.y,
+                                     asteroid.get_collision_radius())
+
+        # Las entidades destruidas se marcan y se eliminan al final
+        dead_bullets = self.dead_bullets
+        dead_asteroids = self.dead_asteroids
+        dead_ufos = self.dead_ufos
+        fragments = self.fragments
+
+        # Las balas se prueban con barrido: el segmento recorrido en el
+        # frame, relativo al otro objeto, así una bala rápida no atraviesa
+        # un fragmento pequeño entre dos frames. Contra los asteroides el
+        # círculo envolvente descarta primero y sólo entonces se prueba el
+        # casco exacto (ver narrowphase.py)
+
+        # Colisiones bala del jugador - asteroide
+        for bullet in self.bullets:
+            if bullet.is_ufo_bullet:
+                continue
+
+            # Si la bala alcanza a varios gana el primero en la partida
+            # (ver asteroid_order): el orden de los candidatos depende de la
+            # rejilla o del almacén de arrays y no debe decidir
+            step_x, step_y = bullet.get_step()
+            reach = math.hypot(step_x, step_y) / 2 + ASTEROID_MAX_STEP
+            target = None
+            for asteroid in asteroid_grid.query(bullet.x - step_x / 2,
+                                                bullet.y - step_y / 2, reach):
+                if asteroid in dead_asteroids:
+                    continue
+                relative_x = step_x - asteroid.vel_x
+                relative_y = step_y - asteroid.vel_y
+                if segment_circle_hit(bullet.x, bullet.y,
+                                      relative_x, relative_y,
+                                      asteroid.x, asteroid.y,
+                                      asteroid.get_collision_radius()) and \
+                        segment_hull_hit(bullet.x, bullet.y,
+                                         relative_x, relative_y,
+                                         asteroid.x, asteroid.y,
+                                         asteroid.get_hull()):
+                    if target is None or self.asteroid_order(asteroid) < \
+                            self.asteroid_order(target):
+                        target = asteroid
+            if target is None:
+                continue
+
+            dead_bullets.add(bullet)
+            dead_asteroids.add(target)
+            self.events.emit(ASTEROID_DESTROYED, self.frame,
+                             target.x, target.y, target.size_index)
+
+            # Dividir el asteroide
+            for new_asteroid in target.split(self.asteroid_pool.acquire):
+                fragments.append(new_asteroid)
+                if self.world is None:
+                    asteroid_grid.insert(new_asteroid, new_asteroid.x,
+                                         new_asteroid.y,
+                                         new_asteroid.get_collision_radius())
+
+        # Colisiones bala del jugador - UFO
+        for bullet in self.bullets:
+            if bullet.is_ufo_bullet or bullet in dead_bullets:
+                continue
+
+            # La caja del UFO se agranda con la mitad de la bala (4x4). Los
+            # UFOs no envuelven: se prueban todos (hay uno como mucho), fuera
+            # de la rejilla, sin wraparound
+            step_x, step_y = bullet.get_step()
+            for ufo in self.ufos:
+                if ufo in dead_ufos:
+                    continue
+                if segment_box_hit(bullet.x, bullet.y,
+                                   step_x - ufo.vel_x, step_y - ufo.vel_y,
+                                   ufo.x, ufo.y,
+                                   ufo.width / 2 + 2, ufo.height / 2 + 2):
+                    dead_bullets.add(bullet)
+                    dead_ufos.add(ufo)
+                    self.events.emit(UFO_KILLED, self.frame, ufo.x, ufo.y)
+                    break
+
+        if self.invulnerable_time <= 0:
+            ship = self.ship
+
+            # Colisiones nave - asteroide: círculos envolventes y después
+            # el triángulo de la nave contra el casco del asteroide
+            ship_hull = ship.get_hull(ship.angle)
+            for asteroid in asteroid_grid.query(ship.x, ship.y, ship.size):
+                if asteroid in dead_asteroids:
+                    continue
+                reach = asteroid.get_collision_radius() + ship.size
+                if wrapped_distance_sq(ship.x, ship.y, asteroid.x,
+                                       asteroid.y) >= reach * reach:
+                    continue
+                if hull_triangle_hit(asteroid.x, asteroid.y,
+                                     asteroid.get_hull(),
+                                     ship.x, ship.y, ship_hull):
+                    self.hit_ship()
+                    break
+
+            # Colisiones nave - UFO: la caja de la nave contra la del UFO,
+            # como el centro de la nave contra la caja agrandada, sin
+            # wraparound (un UFO fuera de pantalla no alcanza a la nave)
+            for ufo in self.ufos:
+                if ufo in dead_ufos:
+                    continue
+                if segment_box_hit(ship.x, ship.y, 0, 0, ufo.x, ufo.y,
+                                   ufo.width / 2 + ship.size,
+                                   ufo.height / 2 + ship.size):
+                    self.hit_ship()
+                    break
+
+            # Colisiones nave - bala UFO
+            reach = ship.size + 3
+            for bullet in self.bullets:
+                if not bullet.is_ufo_bullet:
+                    continue
+
+                step_x, step_y = bullet.get_step()
+                if segment_circle_hit(bullet.x, bullet.y,
+                                      step_x - ship.vel_x,
+                                      step_y - ship.vel_y,
+                                      ship.x, ship.y, reach):
+                    dead_bullets.add(bullet)
+                    self.hit_ship()
+                    break
+
+        # Eliminar en lote las entidades marcadas
+        if dead_bullets:
+            self.remove_marked(self.bullets, dead_bullets, self.bullet_pool)
+            dead_bullets.clear()
+        if dead_asteroids:
+            self.asteroids.extend(fragments)
+            fragments.clear()
+            self.remove_marked(self.asteroids, dead_asteroids,
+                               self.asteroid_pool)
+            dead_asteroids.clear()
+        if dead_ufos:
+            self.remove_marked(self.ufos, dead_ufos)
+            dead_ufos.clear()
+
+    def asteroid_order(self, asteroid):
+        """Posición de un asteroide en la partida: los de self.asteroids en
+        su orden y detrás los fragmentos creados en este frame"""
+        try:
+            return self.asteroids.index(asteroid)
+        except ValueError:
+            return len(self.asteroids) + self.fragments.index(asteroid)
+
+    def remove_marked(self, entities, dead, pool=None):
+        """Compactar la lista en su lugar, devolviendo al pool las marcadas"""
+        kept = 0
+        for entity in entities:
+            if entity in dead:
+                if pool is not None:
+                    pool.release(entity)
+            else:
+                entities[kept] = entity
+                kept += 1
+        del entities[kept:]
+
+    def hit_ship(self):
+        """Manejar cuando la nave es golpeada"""
+        ship = self.ship
+        self.lives -= 1
+        self.invulnerable_time = INVULNERABILITY_TIME
+        self.events.emit(SHIP_HIT, self.frame, ship.x, ship.y,
+                         lives=self.lives)
+        ship.reset_position()
+
+        if self.lives <= 0:
+            self.events.emit(GAME_OVER, self.frame, lives=0,
+                             level=self.level)
+
+    # Suscriptores propios de la simulación
+
+    def score_asteroid(self, event):
+        self.score += ASTEROID_POINTS[event.size_index]
+
+    def score_ufo(self, event):
+        self.score += UFO_POINTS
+
+    def start_level(self, event):
+        """Generar los asteroides del nivel siguiente"""
+        self.spawn_asteroids(INITIAL_ASTEROIDS + min(self.score // 2000, 4))
+
+    def end_game(self, event):
+        """Calcular el puesto en la tabla una sola vez y pasar a la pantalla
+        que corresponda"""
+        high_scores = self.high_scores
+        if high_scores is not None and high_scores.is_high_score(self.score):
+            self.final_rank = high_scores.get_rank(self.score)
+            self.game_state = "enter_name"
+        else:
+            self.game_state = "game_over"
+
+    def update(self):
+        """Actualizar lógica del juego"""
+        if self.game_state != "playing":
+            return
+
+        self.ship.update()
+
+        vectorized = self.world is not None
+        if vectorized:
+            # Mover balas y asteroides en un solo paso vectorizado
+            self.world.update()
+        else:
+            # Actualizar asteroides
+            for asteroid in self.asteroids:
+                asteroid.update()
+
+        # Actualizar balas, devolviendo al pool las que expiran
+        bullets = self.bullets
+        kept = 0
+        for bullet in bullets:
+            alive = bullet.lifetime > 0 if vectorized else bullet.update()
+            if alive:
+                bullets[kept] = bullet
+                kept += 1
+            else:
+                self.bullet_pool.release(bullet)
+        del bullets[kept:]
+
+        # Actualizar UFOs
+        for ufo in self.ufos[:]:
+            new_bullet = ufo.update(self.ship, self.bullet_pool.acquire)
+            if new_bullet:
+                self.bullets.append(new_bullet)
+
+            if ufo.is_off_screen():
+                self.ufos.remove(ufo)
+
+        # Spawn de UFOs ocasionalmente
+        if self.rng.random() < UFO_SPAWN_CHANCE and len(self.ufos) == 0:
+            self.ufos.append(UFO(self.rng))
+
+        # Reducir tiempo de invulnerabilidad
+        if self.invulnerable_time > 0:
+            self.invulnerable_time -= 1
+
+        profiler = self.profiler
+        if profiler is not None and profiler.enabled:
+            profiler.mark("update")
+            self.check_collisions()
+            profiler.mark("collisions")
+        else:
+            self.check_collisions()
+
+        # Verificar si se ganó el nivel
+        if not self.asteroids:
+            self.level += 1
+            self.events.emit(LEVEL_CLEARED, self.frame, level=self.level)
+
+
+def random_controller(seed=None, shoot_chance=0.2):
+    """Controlador de prueba que pulsa teclas al azar"""
+    rng = random.Random(seed)
+
+    def controller(sim):
+        inputs = rng.randrange(INPUT_SHOOT)
+        if rng.random() < shoot_chance:
+            inputs |= INPUT_SHOOT
+        return inputs
+
+    return controller
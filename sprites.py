@@ -0,0 +1,79 @@
+"""
+Caché de sprites de asteroides rotados para Asteroids
+
+Cada forma del catálogo (shapes.py) se rasteriza una sola vez por ángulo
+cuantizado y todos los asteroides que la usan comparten los fotogramas, que
+después sólo se copian con blit. Las formas menos usadas se descartan (LRU)
+para acotar la memoria.
+"""
+
+import pygame
+import math
+from collections import OrderedDict
+from constants import *
+from broadphase import wrap_lerp
+
+
+class AsteroidSpriteCache:
+    def __init__(self, angles=ASTEROID_SPRITE_ANGLES,
+                 max_shapes=ASTEROID_SPRITE_CACHE_SIZE):
+        self.angles = angles
+        self.max_shapes = max_shapes
+        # (tamaño, plantilla) -> (radio, [fotogramas])
+        self.shapes = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_frame(self, asteroid):
+        """Fotograma pre-rasterizado más cercano a la rotación actual"""
+        key = asteroid.shape_id
+        entry = self.shapes.get(key)
+        if entry is None:
+            radius = asteroid.shape.radius
+            entry = (int(math.ceil(radius)) + 1, [None] * self.angles)
+            self.shapes[key] = entry
+            if len(self.shapes) > self.max_shapes:
+                self.shapes.popitem(last=False)
+        else:
+            self.shapes.move_to_end(key)
+
+        half, frames = entry
+        index = round(asteroid.rotation * self.angles / 360) % self.angles
+        frame = frames[index]
+        if frame is None:
+            self.misses += 1
+            frame = self._render(asteroid.points, half,
+                                 index * 360 / self.angles)
+            frames[index] = frame
+        else:
+            self.hits += 1
+        return half, frame
+
+    def draw(self, screen, asteroid, alpha=1.0):
+        """Dibujar un asteroide copiando su fotograma"""
+        half, frame = self.get_frame(asteroid)
+        x = wrap_lerp(asteroid.prev_x, asteroid.x, alpha, WINDOW_WIDTH)
+        y = wrap_lerp(asteroid.prev_y, asteroid.y, alpha, WINDOW_HEIGHT)
+        return screen.blit(frame, (x - half, y - half))
+
+    def clear(self):
+        self.shapes.clear()
+
+    def _render(self, points, half, rotation):
+        side = half * 2 + 1
+        surface = pygame.Surface((side, side))
+        surface.fill(BLACK)
+        surface.set_colorkey(BLACK)
+
+        rotation_rad = math.radians(rotation)
+        cos_r = math.cos(rotation_rad)
+        sin_r = math.sin(rotation_rad)
+        rotated_points = [(px * cos_r - py * sin_r + half,
+                           px * sin_r + py * cos_r + half)
+                          for px, py in points]
+        pygame.draw.polygon(surface, WHITE, rotated_points, 1)
+
+        # Convertir al formato de la pantalla acelera el blit
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        return surface
@@ -0,0 +1,32 @@
+"""
+Medición del arranque de Asteroids
+
+Registra cuánto tarda cada fase (imports, inicialización, creación del juego)
+hasta que el primer frame llega a la pantalla; ver main.py --startup-profile.
+"""
+
+import time
+
+
+class StartupTimer:
+    """Tiempos de las fases del arranque, en orden"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.phases = []  # (nombre, segundos)
+
+    def mark(self, name):
+        """Cerrar la fase `name`, que empezó con la marca anterior"""
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+
+    def report(self):
+        """Imprimir el desglose por fase y el total"""
+        total = self.last - self.start
+        print("Arranque:")
+        for name, seconds in self.phases:
+            share = seconds / total * 100 if total else 0.0
+            print(f"  {name:<20} {seconds * 1000:8.1f} ms {share:5.1f}%")
+        print(f"  {'total':<20} {total * 1000:8.1f} ms")
@@ -0,0 +1,173 @@
+"""
+Pruebas de la geometría de colisiones: broadphase (wraparound, barridos
+contra círculos y cajas, rejilla) y narrowphase (polígonos)
+"""
+
+import pytest
+
+from broadphase import (wrap_delta, wrapped_distance_sq, segment_circle_hit,
+                        segment_box_hit, SpatialGrid)
+from constants import WINDOW_WIDTH, WINDOW_HEIGHT
+from narrowphase import (point_in_polygon, segments_cross,
+                         segment_polygon_hit, polygons_overlap,
+                         segment_hull_hit, hull_triangle_hit)
+
+SQUARE = [(-10, -10), (10, -10), (10, 10), (-10, 10)]
+# Una "C": la muesca (5..10, -4..4) queda fuera del polígono
+NOTCHED = [(-10, -10), (10, -10), (10, -4), (5, -4), (5, 4), (10, 4),
+           (10, 10), (-10, 10)]
+
+
+# wraparound
+
+@pytest.mark.parametrize("delta, expected", [
+    (0, 0), (30, 30), (-30, -30),
+    (780, -20),  # de 10 a 790: más corto hacia la izquierda
+    (-780, 20),
+    (400, 400),  # exactamente media pantalla: se mantiene positivo
+    (1630, 30),  # más de una vuelta
+])
+def test_wrap_delta(delta, expected):
+    assert wrap_delta(delta, WINDOW_WIDTH) == expected
+
+
+def test_wrapped_distance_across_the_seam():
+    assert wrapped_distance_sq(795, 597, 5, 3) == 10 ** 2 + 6 ** 2
+    assert wrapped_distance_sq(5, 3, 795, 597) == 10 ** 2 + 6 ** 2
+
+
+# segmentos y polígonos
+
+def test_segments_cross():
+    assert segments_cross(-5, 0, 5, 0, 0, -5, 0, 5)
+    assert not segments_cross(-5, 0, 5, 0, -5, 1, 5, 1)  # paralelos
+    assert not segments_cross(-5, 0, 5, 0, 6, -5, 6, 5)  # no llegan
+
+
+def test_segments_touching_do_not_cross():
+    # Un extremo sobre el otro segmento o solapes colineales no cuentan
+    assert not segments_cross(-5, 0, 5, 0, 0, 0, 0, 5)
+    assert not segments_cross(-5, 0, 5, 0, 0, -5, 0, 0)
+    assert not segments_cross(-5, 0, 5, 0, 0, 0, 10, 0)
+
+
+@pytest.mark.parametrize("x, y, inside", [
+    (0, 0, True), (9.9, 9.9, True), (11, 0, False), (0, -10.5, False),
+])
+def test_point_in_square(x, y, inside):
+    assert point_in_polygon(x, y, SQUARE) == inside
+
+
+@pytest.mark.parametrize("x, y, inside", [
+    (0, 0, True), (7, 0, False), (7, 7, True), (7, -7, True),
+])
+def test_point_in_concave_polygon(x, y, inside):
+    assert point_in_polygon(x, y, NOTCHED) == inside
+
+
+def test_segment_polygon_hit_end_inside():
+    assert segment_polygon_hit(-20, 0, 0, 0, SQUARE)
+
+
+def test_segment_polygon_hit_tunnelling():
+    # Los dos extremos fuera: el paso atraviesa el casco entero
+    assert segment_polygon_hit(-50, 0, 50, 0, SQUARE)
+    assert segment_polygon_hit(-50, -40, 50, 40, SQUARE)
+
+
+def test_segment_polygon_hit_grazing():
+    # Pasa rozando por fuera del lado, por dentro, o entra por la muesca
+    assert not segment_polygon_hit(-50, 10.01, 50, 10.01, SQUARE)
+    assert segment_polygon_hit(-50, 9.99, 50, 9.99, SQUARE)
+    assert not segment_polygon_hit(20, 0, 7, 0, NOTCHED)
+    assert segment_polygon_hit(20, 0, 4, 0, NOTCHED)
+    # Tocar sólo un vértice tampoco cuenta
+    assert not segment_polygon_hit(0, 20, 20, 0, SQUARE)
+
+
+def test_polygons_overlap():
+    shifted = [(x + 15, y) for x, y in SQUARE]
+    far = [(x + 25, y) for x, y in SQUARE]
+    small = [(x / 4, y / 4) for x, y in SQUARE]
+    assert polygons_overlap(SQUARE, shifted)
+    assert not polygons_overlap(SQUARE, far)
+    assert polygons_overlap(SQUARE, small)  # contenido, sin cortes
+    assert polygons_overlap(small, SQUARE)
+
+
+def test_segment_hull_hit_across_the_seam():
+    # Casco pegado al borde derecho, bala que acaba de aparecer por la
+    # izquierda tras cruzar el borde
+    assert segment_hull_hit(2, 300, 8, 0, 795, 300, SQUARE)
+    assert segment_hull_hit(400, 2, 0, 8, 400, 595, SQUARE)
+    assert not segment_hull_hit(30, 300, 8, 0, 795, 300, SQUARE)
+
+
+def test_hull_triangle_hit_across_the_seam():
+    triangle = [(5, 0), (-3, 3), (-3, -3)]
+    assert hull_triangle_hit(795, 300, SQUARE, 2, 300, triangle)
+    assert hull_triangle_hit(795, 5, SQUARE, 795, 595, triangle)
+    assert not hull_triangle_hit(795, 300, SQUARE, 25, 300, triangle)
+
+
+# barridos contra círculos
+
+def test_segment_circle_hit_end_inside():
+    assert segment_circle_hit(100, 100, 8, 0, 102, 100, 5)
+
+
+def test_segment_circle_hit_tunnelling():
+    # A gran velocidad ambos extremos quedan fuera del círculo
+    assert segment_circle_hit(150, 100, 100, 0, 100, 100, 5)
+    assert not segment_circle_hit(150, 110, 100, 0, 100, 100, 5)
+
+
+def test_segment_circle_hit_grazing():
+    # Tangente exacta no cuenta; un poco más cerca sí
+    assert not segment_circle_hit(150, 105, 100, 0, 100, 100, 5)
+    assert segment_circle_hit(150, 104.9, 100, 0, 100, 100, 5)
+
+
+def test_segment_circle_hit_across_the_seam():
+    assert segment_circle_hit(3, 300, 8, 0, 798, 300, 2)
+    assert segment_circle_hit(400, 3, 0, 8, 400, 598, 2)
+
+
+# barridos contra cajas (UFOs, sin wraparound)
+
+def test_segment_box_hit_tunnelling():
+    assert segment_box_hit(150, 100, 100, 0, 100, 100, 12, 6)
+    assert segment_box_hit(150, 150, 100, 100, 100, 100, 12, 6)
+    assert not segment_box_hit(150, 110, 100, 0, 100, 100, 12, 6)
+
+
+def test_segment_box_hit_grazing():
+    # Sobre el borde de la caja no cuenta; justo dentro sí
+    assert not segment_box_hit(150, 106, 100, 0, 100, 100, 12, 6)
+    assert segment_box_hit(150, 105.9, 100, 0, 100, 100, 12, 6)
+    assert not segment_box_hit(112, 100, 0, 0, 100, 100, 12, 6)
+
+
+def test_segment_box_hit_does_not_wrap():
+    # Un UFO que entra por la izquierda no alcanza a una bala o una nave
+    # junto al borde derecho, aunque envolviendo estarían encima
+    assert not segment_box_hit(788, 300, 8, 0, -20, 300, 12, 6)
+    assert not segment_box_hit(795, 300, 0, 0, -20, 300, 12 + 10, 6 + 10)
+    assert not segment_box_hit(400, 595, 0, 8, 400, -5, 12, 6)
+    # Sin cruzar el borde sí
+    assert segment_box_hit(-15, 300, 8, 0, -20, 300, 12, 6)
+
+
+# rejilla
+
+def test_grid_finds_neighbours_across_the_seam():
+    grid = SpatialGrid()
+    near_edge = object()
+    far = object()
+    grid.insert(near_edge, WINDOW_WIDTH - 3, WINDOW_HEIGHT - 3, 10)
+    grid.insert(far, 400, 300, 10)
+    assert near_edge in grid.query(2, 2, 5)
+    assert far not in grid.query(2, 2, 5)
+
+    grid.clear()
+    assert grid.query(2, 2, 5) == []
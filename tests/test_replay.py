@@ -0,0 +1,91 @@
+"""
+Determinismo de las repeticiones: una partida grabada con semilla se
+reproduce con la misma puntuación y el mismo estado final, tanto con
+entidades como objetos como con el almacén en arrays
+"""
+
+import random
+
+import pytest
+
+from replay import Replay, ReplayRecorder, verify_replay
+from simulation import Simulation
+
+SEED = 9
+STEPS = 6000
+
+
+def _snapshot(sim):
+    """Estado comparable de la partida"""
+    ship = sim.ship
+    return {
+        "frame": sim.frame,
+        "score": sim.score,
+        "lives": sim.lives,
+        "level": sim.level,
+        "state": sim.game_state,
+        "ship": (ship.x, ship.y, ship.angle, ship.vel_x, ship.vel_y),
+        "asteroids": [(a.x, a.y, a.size_index, a.rotation)
+                      for a in sim.asteroids],
+        "bullets": [(b.x, b.y, b.is_ufo_bullet) for b in sim.bullets],
+        "ufos": [(u.x, u.y) for u in sim.ufos],
+        "stats": sim.stats.as_dict(),
+    }
+
+
+def _record(array_store):
+    """Jugar una partida con entradas pseudoaleatorias y grabarla"""
+    recorder = ReplayRecorder(array_store)
+    sim = Simulation(array_store=array_store, seed=SEED, recorder=recorder)
+    rng = random.Random(5)
+    for _ in range(STEPS):
+        if sim.game_state != "playing":
+            break
+        sim.step(rng.randrange(32))
+    return recorder.replay(sim.score), sim
+
+
+@pytest.fixture(params=[False, True], ids=["objects", "arrays"])
+def array_store(request):
+    if request.param:
+        pytest.importorskip("numpy")
+    return request.param
+
+
+def test_replay_reproduces_score_and_state(array_store):
+    replay, sim = _record(array_store)
+    assert sim.score > 0  # la partida tiene que haber puntuado algo
+
+    # Pasar por bytes, como al guardar y cargar un archivo
+    replay = Replay.from_bytes(replay.to_bytes())
+    assert replay.array_store == array_store
+
+    ok, replayed = verify_replay(replay)
+    assert ok
+    assert _snapshot(replayed) == _snapshot(sim)
+
+
+def test_replay_is_identical_across_runs(array_store):
+    first, _ = _record(array_store)
+    second, _ = _record(array_store)
+    assert first.to_bytes() == second.to_bytes()
+
+
+def test_tampered_score_fails_verification():
+    replay, _ = _record(False)
+    replay.score += 10
+    ok, _ = verify_replay(replay)
+    assert not ok
+
+
+def test_negative_seed_is_recorded_as_unsigned():
+    recorder = ReplayRecorder()
+    sim = Simulation(seed=-1, recorder=recorder)
+    assert sim.seed == 0xFFFFFFFF
+    for _ in range(100):
+        sim.step(0)
+
+    replay = Replay.from_bytes(recorder.replay(sim.score).to_bytes())
+    ok, replayed = verify_replay(replay)
+    assert ok
+    assert _snapshot(replayed) == _snapshot(sim)
@@ -0,0 +1,38 @@
+"""
+La simulación con el almacén de arrays juega exactamente la misma partida
+que con entidades como objetos
+"""
+
+import pytest
+
+from simulation import Simulation, random_controller
+
+FRAMES = 3000
+
+
+def _play(array_store, seed, controller_seed):
+    """Jugar hasta el fin de la partida; devuelve el estado de cada 50
+    frames y el final"""
+    sim = Simulation(array_store=array_store, seed=seed)
+    controller = random_controller(controller_seed)
+    trace = []
+    for _ in range(FRAMES):
+        if sim.game_state != "playing":
+            break
+        sim.step(controller(sim))
+        if sim.frame % 50 == 0:
+            trace.append((sim.frame, sim.score,
+                          [(a.x, a.y) for a in sim.asteroids]))
+    final = (sim.frame, sim.score, sim.lives, sim.game_state,
+             [(a.x, a.y, a.size_index) for a in sim.asteroids])
+    return trace, final
+
+
+@pytest.mark.parametrize("seed, controller_seed",
+                         [(11, 4), (7, 7), (16, 16), (24, 24)])
+def test_array_store_plays_the_same_game(seed, controller_seed):
+    pytest.importorskip("numpy")
+    objects = _play(False, seed, controller_seed)
+    arrays = _play(True, seed, controller_seed)
+    assert arrays[1] == objects[1]
+    assert arrays[0] == objects[0]
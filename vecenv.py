@@ -0,0 +1,282 @@
+"""
+Entornos vectorizados de Asteroids para ajuste de balance y evaluación de
+agentes
+
+VectorEnv avanza N simulaciones headless al mismo ritmo, repartidas en
+fragmentos contiguos entre procesos de trabajo (multiprocessing.Process,
+uno por fragmento, cada uno con su Pipe de órdenes). Acciones,
+observaciones, recompensas y fines de episodio viven en memoria compartida:
+los procesos escriben directamente en los arrays y por el Pipe sólo viajan
+las órdenes, así el rendimiento escala casi linealmente con los núcleos.
+
+    with VectorEnv(64, num_workers=4, seed=1) as env:
+        ship, asteroids, count, features = env.reset()
+        (ship, asteroids, count, features), rewards, dones = env.step(actions)
+"""
+
+import os
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import multiprocessing
+from multiprocessing import shared_memory
+
+from constants import *
+from observation import ObservationEncoder
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+SHIP_FEATURES = 8  # x, y, vel_x, vel_y, ángulo, vidas, puntuación, invulnerable
+ASTEROID_FEATURES = 5  # x, y, vel_x, vel_y, size_index
+
+
+def _buffer_layout(num_envs, max_asteroids, k_nearest):
+    """Nombre, forma y tipo de cada array compartido"""
+    features = ObservationEncoder(k_nearest).size
+    return [
+        ("actions", (num_envs,), np.uint8),
+        ("features", (num_envs, features), np.float32),
+        ("ship", (num_envs, SHIP_FEATURES), np.float32),
+        ("asteroids", (num_envs, max_asteroids, ASTEROID_FEATURES),
+         np.float32),
+        ("asteroid_count", (num_envs,), np.int32),
+        ("rewards", (num_envs,), np.float32),
+        ("dones", (num_envs,), np.bool_),
+    ]
+
+
+class SharedBuffers:
+    """Arrays NumPy respaldados por bloques de memoria compartida"""
+
+    def __init__(self, layout, names=None):
+        self.blocks = {}
+        self.arrays = {}
+        self.owner = names is None
+        for name, shape, dtype in layout:
+            size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            if self.owner:
+                block = shared_memory.SharedMemory(create=True, size=size)
+            else:
+                block = shared_memory.SharedMemory(name=names[name])
+            self.blocks[name] = block
+            array = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+            if self.owner:
+                array.fill(0)
+            self.arrays[name] = array
+
+    def names(self):
+        return {name: block.name for name, block in self.blocks.items()}
+
+    def close(self):
+        self.arrays.clear()
+        for block in self.blocks.values():
+            block.close()
+            if self.owner:
+                block.unlink()
+        self.blocks.clear()
+
+
+def write_state(sim, ship_out, asteroids_out):
+    """Copiar el estado de una simulación en sus filas de los arrays"""
+    ship = sim.ship
+    ship_out[0] = ship.x
+    ship_out[1] = ship.y
+    ship_out[2] = ship.vel_x
+    ship_out[3] = ship.vel_y
+    ship_out[4] = ship.angle % 360
+    ship_out[5] = sim.lives
+    ship_out[6] = sim.score
+    ship_out[7] = sim.invulnerable_time > 0
+
+    count = min(len(sim.asteroids), len(asteroids_out))
+    for i in range(count):
+        asteroid = sim.asteroids[i]
+        row = asteroids_out[i]
+        row[0] = asteroid.x
+        row[1] = asteroid.y
+        row[2] = asteroid.vel_x
+        row[3] = asteroid.vel_y
+        row[4] = asteroid.size_index
+    asteroids_out[count:] = 0
+    return count
+
+
+class _Shard:
+    """Simulaciones de un rango [start, end) de entornos"""
+
+    def __init__(self, arrays, start, end, seed, frame_skip, array_store,
+                 k_nearest):
+        from simulation import Simulation
+
+        self.arrays = arrays
+        self.encoder = ObservationEncoder(k_nearest)
+        self.start = start
+        self.frame_skip = frame_skip
+        self.seed = seed
+        self.episodes = [0] * (end - start)
+        self.sims = [Simulation(array_store=array_store,
+                                seed=self._next_seed(start + i))
+                     for i in range(end - start)]
+
+    def _next_seed(self, env):
+        # Semillas por entorno y episodio, independientes del reparto en
+        # procesos: el mismo VectorEnv da los mismos resultados con 1 o N
+        episode = self.episodes[env - self.start]
+        self.episodes[env - self.start] = episode + 1
+        return (self.seed * 1000003 + env * 7919 + episode * 104729) \
+            & 0xFFFFFFFF
+
+    def reset(self):
+        arrays = self.arrays
+        for i, sim in enumerate(self.sims):
+            env = self.start + i
+            sim.reset_game(self._next_seed(env))
+            self.observe(sim, env)
+            arrays["rewards"][env] = 0
+            arrays["dones"][env] = False
+
+    def step(self):
+        arrays = self.arrays
+        actions = arrays["actions"]
+        for i, sim in enumerate(self.sims):
+            env = self.start + i
+            score = sim.score
+            inputs = int(actions[env])
+            for _ in range(self.frame_skip):
+                sim.step(inputs)
+                if sim.game_state != "playing":
+                    break
+            arrays["rewards"][env] = sim.score - score
+
+            # Al terminar un episodio se reinicia automáticamente
+            done = sim.game_state != "playing"
+            arrays["dones"][env] = done
+            if done:
+                sim.reset_game(self._next_seed(env))
+            self.observe(sim, env)
+
+    def observe(self, sim, env):
+        arrays = self.arrays
+        arrays["asteroid_count"][env] = write_state(
+            sim, arrays["ship"][env], arrays["asteroids"][env])
+        self.encoder.encode(sim, arrays["features"][env])
+
+
+def _worker(conn, names, layout, start, end, seed, frame_skip, array_store,
+            k_nearest):
+    buffers = SharedBuffers(layout, names)
+    shard = _Shard(buffers.arrays, start, end, seed, frame_skip, array_store,
+                   k_nearest)
+    try:
+        while True:
+            command = conn.recv()
+            if command == "step":
+                shard.step()
+            elif command == "reset":
+                shard.reset()
+            elif command == "close":
+                break
+            conn.send(True)
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        shard.arrays = None
+        buffers.close()
+        conn.close()
+
+
+class VectorEnv:
+    """N partidas de Asteroids avanzando a la vez.
+
+    Las acciones son máscaras INPUT_* de simulation.py. Además del estado
+    crudo, `features` guarda la observación de ObservationEncoder de cada
+    entorno. Con num_workers=0 todo se ejecuta en el proceso actual, útil
+    para depurar.
+    """
+
+    def __init__(self, num_envs, num_workers=None, seed=0, frame_skip=1,
+                 max_asteroids=64, array_store=False, k_nearest=8):
+        if np is None:
+            raise RuntimeError("Los entornos vectorizados necesitan numpy")
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        num_workers = min(num_workers, num_envs)
+
+        self.num_envs = num_envs
+        self.max_asteroids = max_asteroids
+        layout = _buffer_layout(num_envs, max_asteroids, k_nearest)
+        self.buffers = SharedBuffers(layout)
+        arrays = self.buffers.arrays
+        self.actions = arrays["actions"]
+        self.features = arrays["features"]
+        self.ship = arrays["ship"]
+        self.asteroids = arrays["asteroids"]
+        self.asteroid_count = arrays["asteroid_count"]
+        self.rewards = arrays["rewards"]
+        self.dones = arrays["dones"]
+
+        self.local = None
+        self.workers = []
+        if num_workers == 0:
+            self.local = _Shard(arrays, 0, num_envs, seed, frame_skip,
+                                array_store, k_nearest)
+            return
+
+        # Repartir los entornos en fragmentos contiguos por proceso
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+        names = self.buffers.names()
+        for start, end in zip(bounds[:-1], bounds[1:]):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=_worker, daemon=True,
+                args=(child, names, layout, int(start), int(end), seed,
+                      frame_skip, array_store, k_nearest))
+            process.start()
+            child.close()
+            self.workers.append((process, parent))
+
+    def observations(self):
+        """Vistas (sin copia) de la nave, los asteroides, su cantidad y las
+        observaciones de ObservationEncoder"""
+        return self.ship, self.asteroids, self.asteroid_count, self.features
+
+    def reset(self):
+        self._broadcast("reset")
+        return self.observations()
+
+    def step(self, actions):
+        """Aplicar una acción por entorno y avanzar un paso en lockstep"""
+        self.actions[:] = actions
+        self._broadcast("step")
+        return self.observations(), self.rewards, self.dones
+
+    def _broadcast(self, command):
+        if self.local is not None:
+            getattr(self.local, command)()
+            return
+        for _, conn in self.workers:
+            conn.send(command)
+        for _, conn in self.workers:
+            conn.recv()
+
+    def close(self):
+        for process, conn in self.workers:
+            try:
+                conn.send("close")
+            except (BrokenPipeError, OSError):
+                pass
+        for process, conn in self.workers:
+            process.join(timeout=5)
+            conn.close()
+        self.workers = []
+        self.local = None
+        self.buffers.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
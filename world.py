@@ -0,0 +1,207 @@
+"""
+Almacén de entidades en arrays NumPy (structure-of-arrays) para Asteroids
+
+Las posiciones, velocidades, rotaciones, vida útil y tamaños de asteroides y
+balas se guardan en arrays contiguos y avanzan en un solo paso vectorizado
+por frame. Las clases Asteroid y Bullet siguen existiendo como vistas
+delgadas sobre una ranura del array, así Game y el código de dibujo no
+cambian. NumPy es opcional: sólo hace falta si se activa este almacén.
+"""
+
+import random
+from constants import *
+from entities import Asteroid, Bullet
+from shapes import CATALOGUE
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _field(name):
+    """Propiedad que lee y escribe una columna del almacén"""
+    def get(self):
+        return getattr(self.store, name).item(self.slot)
+
+    def set(self, value):
+        getattr(self.store, name)[self.slot] = value
+
+    return property(get, set)
+
+
+class _ArrayStore:
+    """Columnas de un tipo de entidad con lista de ranuras libres"""
+
+    FIELDS = ()
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        for name, dtype in self.FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.active = np.zeros(capacity, dtype=bool)
+        self.views = [None] * capacity
+        self.free = list(range(capacity - 1, -1, -1))
+        self.size = 0  # ranuras usadas alguna vez; se vectoriza sobre [:size]
+
+    def allocate(self, view):
+        """Reservar una ranura para una vista nueva"""
+        if not self.free:
+            self._grow()
+        slot = self.free.pop()
+        self.active[slot] = True
+        self.views[slot] = view
+        if slot >= self.size:
+            self.size = slot + 1
+        return slot
+
+    def release(self, slot):
+        """Devolver una ranura a la lista libre"""
+        self.active[slot] = False
+        self.views[slot] = None
+        self.free.append(slot)
+
+    def clear(self):
+        """Liberar todas las ranuras"""
+        self.active[:] = False
+        self.views = [None] * self.capacity
+        self.free = list(range(self.capacity - 1, -1, -1))
+        self.size = 0
+
+    def __len__(self):
+        return int(np.count_nonzero(self.active[:self.size]))
+
+    def _grow(self):
+        old = self.capacity
+        new = old * 2
+        for name, dtype in self.FIELDS:
+            column = np.zeros(new, dtype=dtype)
+            column[:old] = getattr(self, name)
+            setattr(self, name, column)
+        active = np.zeros(new, dtype=bool)
+        active[:old] = self.active
+        self.active = active
+        self.views.extend([None] * (new - old))
+        self.free = list(range(new - 1, old - 1, -1))
+        self.capacity = new
+
+
+class AsteroidStore(_ArrayStore):
+    FIELDS = (("x", "f8"), ("y", "f8"), ("vel_x", "f8"), ("vel_y", "f8"),
+              ("rotation", "f8"), ("rotation_speed", "f8"),
+              ("size_index", "i1"))
+
+    def __init__(self, capacity):
+        super().__init__(capacity)
+        # Mayor círculo envolvente de las formas de cada tamaño
+        self.radius_table = np.array(
+            [max(template.radius for template in templates)
+             for templates in CATALOGUE.templates], dtype="f8")
+
+    def update(self):
+        """Mover, envolver y rotar todos los asteroides a la vez"""
+        n = self.size
+        x = self.x[:n]
+        y = self.y[:n]
+        x += self.vel_x[:n]
+        y += self.vel_y[:n]
+        np.remainder(x, WINDOW_WIDTH, out=x)
+        np.remainder(y, WINDOW_HEIGHT, out=y)
+        rotation = self.rotation[:n]
+        rotation += self.rotation_speed[:n]
+
+    def query(self, x, y, radius=0):
+        """Asteroides activos cuyo círculo de colisión toca (x, y, radius)"""
+        n = self.size
+        dx = np.abs(self.x[:n] - x)
+        dy = np.abs(self.y[:n] - y)
+        np.minimum(dx, WINDOW_WIDTH - dx, out=dx)
+        np.minimum(dy, WINDOW_HEIGHT - dy, out=dy)
+        reach = self.radius_table[self.size_index[:n]] + radius
+        hits = np.flatnonzero(
+            self.active[:n] & (dx * dx + dy * dy <= reach * reach))
+        views = self.views
+        return [views[i] for i in hits]
+
+
+class BulletStore(_ArrayStore):
+    FIELDS = (("x", "f8"), ("y", "f8"), ("vel_x", "f8"), ("vel_y", "f8"),
+              ("lifetime", "i4"))
+
+    def update(self):
+        """Mover, envolver y consumir la vida de todas las balas a la vez"""
+        n = self.size
+        x = self.x[:n]
+        y = self.y[:n]
+        x += self.vel_x[:n]
+        y += self.vel_y[:n]
+        np.remainder(x, WINDOW_WIDTH, out=x)
+        np.remainder(y, WINDOW_HEIGHT, out=y)
+        self.lifetime[:n] -= 1
+
+
+class AsteroidView(Asteroid):
+    """Asteroide cuyos datos viven en un AsteroidStore"""
+
+    store = None
+
+    x = _field("x")
+    y = _field("y")
+    vel_x = _field("vel_x")
+    vel_y = _field("vel_y")
+    rotation = _field("rotation")
+    rotation_speed = _field("rotation_speed")
+    size_index = _field("size_index")
+
+    def reset(self, x, y, size_index, rng=random):
+        self.slot = self.store.allocate(self)
+        super().reset(x, y, size_index, rng)
+
+    def release(self):
+        self.store.release(self.slot)
+
+
+class BulletView(Bullet):
+    """Bala cuyos datos viven en un BulletStore"""
+
+    store = None
+
+    x = _field("x")
+    y = _field("y")
+    vel_x = _field("vel_x")
+    vel_y = _field("vel_y")
+    lifetime = _field("lifetime")
+
+    def reset(self, x, y, angle, is_ufo_bullet=False):
+        self.slot = self.store.allocate(self)
+        super().reset(x, y, angle, is_ufo_bullet)
+
+    def release(self):
+        self.store.release(self.slot)
+
+
+class ArrayWorld:
+    """Almacén de asteroides y balas en arrays contiguos.
+
+    `Asteroid` y `Bullet` son subclases de las vistas ligadas a este mundo,
+    con la misma firma que las clases de entities.py.
+    """
+
+    def __init__(self, capacity=256):
+        if np is None:
+            raise RuntimeError("El almacén de arrays necesita numpy")
+        self.asteroids = AsteroidStore(capacity)
+        self.bullets = BulletStore(capacity)
+        self.Asteroid = type("Asteroid", (AsteroidView,),
+                             {"store": self.asteroids})
+        self.Bullet = type("Bullet", (BulletView,),
+                           {"store": self.bullets})
+
+    def update(self):
+        """Avanzar un frame de todas las entidades del almacén"""
+        self.asteroids.update()
+        self.bullets.update()
+
+    def clear(self):
+        self.asteroids.clear()
+        self.bullets.clear()